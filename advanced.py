@@ -1,12 +1,21 @@
 # advanced.py
-from PyQt5.QtWidgets import QWidget, QVBoxLayout, QLabel, QPushButton, QInputDialog
-from PyQt5.QtCore import Qt
+import time
+from PyQt5.QtWidgets import (
+    QWidget, QVBoxLayout, QHBoxLayout, QLabel, QPushButton, QInputDialog, QMessageBox,
+    QListWidget, QListWidgetItem
+)
+from PyQt5.QtCore import Qt, pyqtSignal
 from PyQt5.QtGui import QFont
+from workers import showProgress
 
 class AdvancedPanel(QWidget):
-    def __init__(self, git_integration, parent=None):
+    statusChanged = pyqtSignal()   # an operation changed the working tree or index
+    historyChanged = pyqtSignal()  # an operation moved HEAD or rewrote commits
+
+    def __init__(self, git_integration, worker, parent=None):
         super().__init__(parent)
         self.git_integration = git_integration
+        self.worker = worker
 
         layout = QVBoxLayout(self)
         layout.setSpacing(10)
@@ -22,21 +31,37 @@ class AdvancedPanel(QWidget):
         self.pushButton.clicked.connect(self.onPushClicked)
         layout.addWidget(self.pushButton)
 
-        # Stash Button
-        self.stashButton = QPushButton("Stash Changes")
-        self.stashButton.clicked.connect(self.onStashClicked)
-        layout.addWidget(self.stashButton)
-
-        # Pop Stash Button
-        self.popStashButton = QPushButton("Pop Stash")
-        self.popStashButton.clicked.connect(self.onPopStashClicked)
-        layout.addWidget(self.popStashButton)
+        # Fetch Button
+        self.fetchButton = QPushButton("Fetch From Origin")
+        self.fetchButton.clicked.connect(self.onFetchClicked)
+        layout.addWidget(self.fetchButton)
 
         # Interactive Rebase Button
         self.rebaseButton = QPushButton("Interactive Rebase")
         self.rebaseButton.clicked.connect(self.onRebaseClicked)
         layout.addWidget(self.rebaseButton)
 
+        # Stash list
+        stashLabel = QLabel("Stashes")
+        stashLabel.setStyleSheet("font-weight: bold; padding-top: 6px;")
+        layout.addWidget(stashLabel)
+        self.stashList = QListWidget()
+        self.stashList.setStyleSheet("QListWidget { background-color: #2c2c2c; }")
+        layout.addWidget(self.stashList)
+
+        stashButtons = QHBoxLayout()
+        self.stashButton = QPushButton("Stash")
+        self.stashButton.clicked.connect(self.onStashClicked)
+        self.applyStashButton = QPushButton("Apply")
+        self.applyStashButton.clicked.connect(lambda: self.onApplyStashClicked(pop=False))
+        self.popStashButton = QPushButton("Pop")
+        self.popStashButton.clicked.connect(lambda: self.onApplyStashClicked(pop=True))
+        self.dropStashButton = QPushButton("Drop")
+        self.dropStashButton.clicked.connect(self.onDropStashClicked)
+        for button in (self.stashButton, self.applyStashButton, self.popStashButton, self.dropStashButton):
+            stashButtons.addWidget(button)
+        layout.addLayout(stashButtons)
+
         self.setStyleSheet("""
             QWidget { background-color: #2a2a2a; color: #e0e0e0; }
             QPushButton { background-color: #3c3c3c; border: 1px solid #555; padding: 6px; }
@@ -44,27 +69,92 @@ class AdvancedPanel(QWidget):
         """)
 
     def onPushClicked(self):
-        self.git_integration.pushCurrentBranch()
+        self.runRemote("Push", self.git_integration.pushCurrentBranch, "Pushing current branch")
 
-    def onStashClicked(self):
+    def onFetchClicked(self):
+        self.runRemote("Fetch", self.git_integration.fetch, "Fetching from origin")
+
+    def runRemote(self, name, fn, title):
+        """Runs a network operation as a cancellable job with a progress dialog."""
         if not self.git_integration.repo:
             print("No repo loaded.")
             return
-        try:
-            self.git_integration.repo.git.stash("save", "Stash from Advanced Panel")
-            print("Stashed changes.")
-        except Exception as e:
-            print("Stash error:", e)
+        job = self.worker.submit(fn, reports_progress=True, cancellable=True)
+        showProgress(job, self, title)
+        job.signals.failed.connect(lambda error: self.onRemoteFailed(name, job, error))
+        return job
+
+    def onRemoteFailed(self, name, job, error):
+        if job.cancel_event.is_set():
+            return
+        QMessageBox.critical(self, "Error", f"{name} failed: {error}")
 
-    def onPopStashClicked(self):
+    def runOperation(self, description, fn, *args, status=True, history=False):
+        """
+        Runs a repository operation on the worker. Afterwards only what it
+        can have changed is refreshed: the working tree status, the history,
+        and the stash list for stash operations.
+        """
         if not self.git_integration.repo:
             print("No repo loaded.")
+            return None
+        job = self.worker.submit(fn, *args)
+
+        def onFinished(_result):
+            print(f"{description}.")
+            self.afterOperation(status, history)
+
+        def onFailed(error):
+            QMessageBox.critical(self, "Error", f"{description} failed: {error}")
+            self.afterOperation(status, history)
+
+        job.signals.finished.connect(onFinished)
+        job.signals.failed.connect(onFailed)
+        return job
+
+    def afterOperation(self, status, history):
+        if history:
+            self.historyChanged.emit()
+        elif status:
+            self.statusChanged.emit()
+        self.refreshStashes()
+
+    def refreshStashes(self):
+        if not self.git_integration.repo:
+            return
+        job = self.worker.submit(self.git_integration.listStashes)
+        job.signals.finished.connect(self.applyStashes)
+
+    def applyStashes(self, stashes):
+        self.stashList.clear()
+        for ref, sha, when, message in stashes:
+            item = QListWidgetItem(f"{ref}  {message}")
+            item.setData(Qt.UserRole, ref)
+            item.setToolTip(f"{sha}\n{time.strftime('%Y-%m-%d %H:%M', time.localtime(when))}")
+            self.stashList.addItem(item)
+
+    def selectedStash(self):
+        item = self.stashList.currentItem()
+        return item.data(Qt.UserRole) if item is not None else None
+
+    def onStashClicked(self):
+        message, ok = QInputDialog.getText(self, "Stash Changes", "Stash message (optional):")
+        if ok:
+            self.runOperation("Stashed changes", self.git_integration.stashSave, message)
+
+    def onApplyStashClicked(self, pop):
+        ref = self.selectedStash() or "stash@{0}"
+        if pop:
+            self.runOperation(f"Popped {ref}", self.git_integration.stashApply, ref, True)
+        else:
+            self.runOperation(f"Applied {ref}", self.git_integration.stashApply, ref)
+
+    def onDropStashClicked(self):
+        ref = self.selectedStash()
+        if ref is None:
             return
-        try:
-            self.git_integration.repo.git.stash("pop")
-            print("Popped stash.")
-        except Exception as e:
-            print("Pop stash error:", e)
+        if QMessageBox.question(self, "Drop Stash", f"Drop {ref}? Its changes will be lost.") == QMessageBox.Yes:
+            self.runOperation(f"Dropped {ref}", self.git_integration.stashDrop, ref, status=False)
 
     def onRebaseClicked(self):
         if not self.git_integration.repo:
@@ -72,8 +162,33 @@ class AdvancedPanel(QWidget):
             return
         base, ok = QInputDialog.getText(self, "Interactive Rebase", "Rebase onto commit/branch:")
         if ok and base:
-            try:
-                self.git_integration.repo.git.rebase("-i", base)
-                print("Interactive rebase initiated.")
-            except Exception as e:
-                print("Rebase error:", e)
+            # git resolves the base and lists base..HEAD on the worker
+            job = self.worker.submit(self.git_integration.rebaseCandidates, base)
+            job.signals.finished.connect(self.showRebasePlanner)
+            job.signals.failed.connect(lambda error: QMessageBox.critical(self, "Error", f"Cannot rebase: {error}"))
+
+    def showRebasePlanner(self, candidates):
+        from rebaseplanner import RebasePlannerDialog
+        base, commits = candidates
+        if not commits:
+            QMessageBox.information(self, "Interactive Rebase", "There are no commits to rebase.")
+            return
+        dialog = RebasePlannerDialog(base, commits, self)
+        if dialog.exec_() != RebasePlannerDialog.Accepted:
+            return
+        job = self.worker.submit(self.git_integration.rebaseWithPlan, base, dialog.plan())
+        job.signals.finished.connect(lambda _result: self.afterOperation(True, True))
+        job.signals.failed.connect(self.onRebaseFailed)
+
+    def onRebaseFailed(self, error):
+        self.afterOperation(True, True)
+        if not self.git_integration.rebaseInProgress():
+            QMessageBox.critical(self, "Error", f"Rebase failed: {error}")
+            return
+        # Stopped on a conflict: resolve outside the app, or go back to where it started
+        answer = QMessageBox.question(
+            self, "Rebase Stopped",
+            f"The rebase stopped:\n{error}\n\nAbort it and restore the branch?",
+            QMessageBox.Yes | QMessageBox.No)
+        if answer == QMessageBox.Yes:
+            self.runOperation("Aborted rebase", self.git_integration.rebaseAbort, history=True)
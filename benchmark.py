@@ -0,0 +1,297 @@
+# benchmark.py
+"""
+Benchmarks the hot paths of the GUI against synthetic repositories.
+
+    python benchmark.py --commits 20000 --branches 20 --files 50000 --output results.json
+    python benchmark.py --output results.json --baseline baseline.json
+    python benchmark.py --save-baseline baseline.json
+
+A repository with the requested number of commits, branches (forked from and
+merged back into main) and files (spread over trees up to --depth levels
+deep) is generated with `git fast-import`. The panels run headless under the
+offscreen Qt platform. Every measurement is repeated and its median is
+compared with the baseline; the exit status is 1 when any one regressed by
+more than --tolerance.
+"""
+import os
+import sys
+import json
+import time
+import random
+import shutil
+import argparse
+import platform
+import statistics
+import subprocess
+import tempfile
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+EPOCH = 1600000000
+# Slower than the baseline by less than this is noise, whatever the ratio
+MIN_REGRESSION = 0.005
+
+
+def filePath(index, depth):
+    """Deterministic path of the index-th file, between 1 and depth directories deep."""
+    levels = 1 + index % depth
+    parts = [f"dir{(index >> (3 * level)) % 8}" for level in range(levels)]
+    return "/".join(parts + [f"file{index}.txt"])
+
+
+def fileContent(index, version):
+    return f"file {index}\nversion {version}\n" + "line\n" * (index % 20)
+
+
+def fastImportStream(commits, branches, files, depth, seed=0):
+    """
+    Yields a `git fast-import` stream: a root commit adding every file, then
+    commits touching a few files each. Up to branches side branches fork from
+    main and are merged back into it; their refs are kept as branch tips.
+    """
+    rng = random.Random(seed)
+    mark = 0
+    tips = {}           # branch -> mark of its tip
+    unmerged = set()    # branches with commits main does not have yet
+
+    def commit(branch, message, parents, changes):
+        nonlocal mark
+        mark += 1
+        when = EPOCH + mark * 60
+        lines = [f"commit refs/heads/{branch}", f"mark :{mark}",
+                 f"author Bench <bench@example.com> {when} +0000",
+                 f"committer Bench <bench@example.com> {when} +0000",
+                 f"data {len(message.encode())}", message]
+        if parents:
+            lines.append(f"from :{parents[0]}")
+            lines += [f"merge :{parent}" for parent in parents[1:]]
+        for path, content in changes:
+            lines += [f"M 100644 inline {path}", f"data {len(content.encode())}", content]
+        tips[branch] = mark
+        return "\n".join(lines) + "\n\n"
+
+    yield commit("main", "Initial commit", [], [(filePath(i, depth), fileContent(i, 0)) for i in range(files)])
+    for number in range(1, commits):
+        roll = rng.random()
+        changes = []
+        for index in rng.sample(range(files), min(3, files)):
+            changes.append((filePath(index, depth), fileContent(index, number)))
+        if unmerged and roll < 0.1:
+            branch = rng.choice(sorted(unmerged))
+            unmerged.discard(branch)
+            yield commit("main", f"Merge branch '{branch}'", [tips["main"], tips[branch]], changes[:1])
+            continue
+        if len(tips) <= branches and roll < 0.2:
+            branch = f"feature-{len(tips)}"
+            parent = tips["main"]
+        else:
+            branch = rng.choice(sorted(tips))
+            parent = tips[branch]
+        if branch != "main":
+            unmerged.add(branch)
+        yield commit(branch, f"Change {number} on {branch}", [parent], changes)
+
+
+def runGit(directory, *args, **kwargs):
+    return subprocess.run(["git", "-C", directory] + list(args), check=True,
+                          stdout=subprocess.PIPE, **kwargs).stdout
+
+
+def generateRepository(directory, commits, branches, files, depth, seed=0):
+    """Creates the synthetic repository in directory and checks out main."""
+    os.makedirs(directory, exist_ok=True)
+    runGit(directory, "init", "-q")
+    runGit(directory, "symbolic-ref", "HEAD", "refs/heads/main")
+    runGit(directory, "config", "user.name", "Bench")
+    runGit(directory, "config", "user.email", "bench@example.com")
+    proc = subprocess.Popen(["git", "-C", directory, "fast-import", "--quiet"], stdin=subprocess.PIPE)
+    for chunk in fastImportStream(commits, branches, files, depth, seed):
+        proc.stdin.write(chunk.encode())
+    proc.stdin.close()
+    if proc.wait():
+        raise RuntimeError("git fast-import failed")
+    runGit(directory, "checkout", "-q", "-f", "main")
+    # Some local changes so that status has something to report
+    for i in range(0, files, 100):
+        with open(os.path.join(directory, filePath(i, depth)), "a") as f:
+            f.write("local change\n")
+        with open(os.path.join(directory, f"untracked{i}.txt"), "w") as f:
+            f.write("new\n")
+
+
+def timeRuns(fn, repeat, setup=None):
+    """Runs setup() and then times fn() repeat times; returns median, min and all runs in seconds."""
+    runs = []
+    for _ in range(repeat):
+        if setup:
+            setup()
+        start = time.perf_counter()
+        fn()
+        runs.append(time.perf_counter() - start)
+    return {"median": statistics.median(runs), "min": min(runs), "runs": runs}
+
+
+def measure(results, name, fn, repeat, setup=None):
+    """timeRuns() into results[name], printing a summary line."""
+    results[name] = timeRuns(fn, repeat, setup)
+    print(f"{name:<28} median {results[name]['median'] * 1000:10.1f} ms   min {results[name]['min'] * 1000:10.1f} ms")
+
+
+def runBenchmarks(directory, repeat, depth):
+    from PyQt5.QtWidgets import QApplication
+    from gitintegration import GitIntegration
+    from workers import GitWorker
+    from filepanel import FilePanel
+    from graphpanel import GraphPanel
+    from commitcache import CACHE_FILE
+    from repostatus import UNMODIFIED
+
+    app = QApplication.instance() or QApplication(sys.argv[:1])
+    git_integration = GitIntegration()
+    worker = GitWorker()
+    # The panels are created before the repository is set so that their
+    # constructors do not already load it
+    file_panel = FilePanel(git_integration, worker)
+    graph_panel = GraphPanel(git_integration, worker)
+    git_integration.openRepository(directory)
+    results = {}
+
+    def settle(job):
+        # Runs the job and the queued callback that applies its result
+        if job is not None:
+            worker.wait(job)
+        app.processEvents()
+
+    def startApp():
+        # A separate process each time: startup includes the imports
+        output = subprocess.run([sys.executable, os.path.join(HERE, "main.py"), "--startup-time"],
+                                stdout=subprocess.PIPE, text=True, check=True).stdout
+        startup.append(float(output.split()[-1]))
+    startup = []
+    measure(results, "startup (process)", startApp, repeat)
+    results["startup (to first frame)"] = {"median": statistics.median(startup), "min": min(startup), "runs": startup}
+
+    measure(results, "getAllFiles", git_integration.getAllFiles, repeat)
+    measure(results, "getStatus", git_integration.getStatus, repeat)
+
+    def refreshStatus():
+        file_panel.refreshStatus()
+        settle(file_panel.statusLoader.job)
+    measure(results, "FilePanel.refreshStatus", refreshStatus, repeat)
+
+    def dropGraphCache():
+        if git_integration.commit_cache is not None:
+            git_integration.commit_cache.close()
+            git_integration.commit_cache = None
+        path = os.path.join(git_integration.repo.git_dir, CACHE_FILE)
+        if os.path.exists(path):
+            os.remove(path)
+        graph_panel.clearGraph()
+
+    def refreshGraph():
+        graph_panel.refresh()
+        settle(graph_panel.graphLoader.job)
+    measure(results, "GraphPanel.refresh (cold)", refreshGraph, repeat, setup=dropGraphCache)
+    measure(results, "GraphPanel.refresh (warm)", refreshGraph, repeat, setup=graph_panel.clearGraph)
+    measure(results, "GraphPanel.refresh (no-op)", refreshGraph, repeat)
+
+    status = git_integration.getStatus()
+    changed = [path for path, state in status.working if state != UNMODIFIED]
+    measure(results, "stageFiles", lambda: git_integration.stageFiles(changed), repeat,
+            setup=lambda: git_integration.unstageFiles(changed))
+
+    edits = iter(range(10 ** 9))
+
+    def prepareCommit():
+        # Each commit gets its own staged change
+        path = filePath(next(edits), depth)
+        with open(os.path.join(directory, path), "a") as f:
+            f.write("benchmark commit\n")
+        git_integration.stageFiles([path])
+    measure(results, "commit", lambda: git_integration.commit("Benchmark commit"), repeat, setup=prepareCommit)
+
+    worker.pool.waitForDone()
+    return results
+
+
+def gitVersion():
+    try:
+        return subprocess.run(["git", "--version"], stdout=subprocess.PIPE, text=True).stdout.strip()
+    except OSError:
+        return None
+
+
+def compareResults(results, baseline, tolerance):
+    """Prints a comparison with baseline and returns the names of regressed measurements."""
+    regressions = []
+    print("\nCompared with baseline:")
+    for name, result in results["results"].items():
+        previous = baseline["results"].get(name)
+        if previous is None:
+            print(f"{name:<28} (not in baseline)")
+            continue
+        old, new = previous["median"], result["median"]
+        ratio = new / old if old else float("inf")
+        regressed = new > old * (1 + tolerance) and new - old > MIN_REGRESSION
+        print(f"{name:<28} {old * 1000:10.1f} ms -> {new * 1000:10.1f} ms  {ratio:5.2f}x{'  REGRESSION' if regressed else ''}")
+        if regressed:
+            regressions.append(name)
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the GUI against a synthetic repository.")
+    parser.add_argument("--commits", type=int, default=5000)
+    parser.add_argument("--branches", type=int, default=10)
+    parser.add_argument("--files", type=int, default=10000)
+    parser.add_argument("--depth", type=int, default=6, help="maximum directory depth of the files")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--repo", help="generate into (or reuse) this directory; a copy of it is benchmarked")
+    parser.add_argument("--output", help="write the results as JSON to this file")
+    parser.add_argument("--baseline", help="compare with the results in this JSON file")
+    parser.add_argument("--save-baseline", help="write the results as the new baseline to this file")
+    parser.add_argument("--tolerance", type=float, default=0.25,
+                        help="allowed slowdown over the baseline median (0.25 = 25%%)")
+    args = parser.parse_args()
+
+    config = {name: getattr(args, name) for name in ("commits", "branches", "files", "depth", "seed", "repeat")}
+    directory = tempfile.mkdtemp(prefix="gitdag-bench-")
+    try:
+        source = args.repo or directory
+        if not os.path.exists(os.path.join(source, ".git")):
+            start = time.perf_counter()
+            generateRepository(source, args.commits, args.branches, args.files, args.depth, args.seed)
+            print(f"Generated repository in {time.perf_counter() - start:.1f} s: {source}")
+        if args.repo:
+            # Staging and committing change the repository: keep --repo as it was
+            shutil.rmtree(directory)
+            shutil.copytree(args.repo, directory, symlinks=True)
+        results = {
+            "config": config,
+            "environment": {"python": platform.python_version(), "platform": platform.platform(), "git": gitVersion()},
+            "results": runBenchmarks(directory, args.repeat, args.depth),
+        }
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+
+    for path in (args.output, args.save_baseline):
+        if path:
+            with open(path, "w") as f:
+                json.dump(results, f, indent=2)
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        if baseline.get("config") != config:
+            print("Warning: the baseline was recorded with a different configuration:", baseline.get("config"))
+        regressions = compareResults(results, baseline, args.tolerance)
+        if regressions:
+            print(f"\n{len(regressions)} regression(s): {', '.join(regressions)}")
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
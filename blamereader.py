@@ -0,0 +1,83 @@
+# blamereader.py
+from collections import OrderedDict
+
+NULL_SHA = "0" * 40  # lines not committed yet
+
+
+class BlameCommit:
+    """What blame tells about one commit."""
+    __slots__ = ("sha", "author", "time", "summary")
+
+    def __init__(self, sha, author="", time=0, summary=""):
+        self.sha = sha
+        self.author = author
+        self.time = time
+        self.summary = summary
+
+
+def parseBlameStream(stream, commits, cancel=None):
+    """
+    Lazily parses `git blame --incremental` output. Yields one
+    (sha, first line, line count) per group of lines, lines counted from 1,
+    as soon as the group is complete; commits (sha -> BlameCommit) is filled
+    from the headers git sends the first time it names a commit.
+    """
+    group = None
+    for raw in iter(stream.readline, b""):
+        if cancel is not None and cancel.is_set():
+            return
+        line = raw.decode("utf-8", errors="replace").rstrip("\r\n")
+        if group is None:
+            fields = line.split(" ")
+            if len(fields) < 4:
+                continue
+            sha = fields[0]
+            group = (sha, int(fields[2]), int(fields[3]))
+            commit = commits.get(sha)
+            if commit is None:
+                commit = commits[sha] = BlameCommit(sha)
+            continue
+        key, _, value = line.partition(" ")
+        if key == "filename":
+            # Every group ends with the file name
+            yield group
+            group = None
+        elif key == "author":
+            commit.author = value
+        elif key == "author-time":
+            commit.time = int(value or 0)
+        elif key == "summary":
+            commit.summary = value
+
+
+def streamBlame(proc, commits, cancel=None):
+    """Yields the groups of a blame process started with as_process=True; stops it when abandoned."""
+    finished = False
+    try:
+        yield from parseBlameStream(proc.stdout, commits, cancel)
+        finished = cancel is None or not cancel.is_set()
+    finally:
+        if not finished:
+            proc.proc.terminate()
+            proc.proc.wait()
+        else:
+            proc.wait()  # raises GitCommandError on a failed blame
+
+
+class BlameCache:
+    """LRU cache of complete blames keyed by (path, revision)."""
+    def __init__(self, max_entries=32):
+        self.max_entries = max_entries
+        self.entries = OrderedDict()  # key -> (lines, groups, commits)
+
+    def get(self, key):
+        entry = self.entries.get(key)
+        if entry is not None:
+            self.entries.move_to_end(key)
+        return entry
+
+    def put(self, key, entry):
+        self.entries[key] = entry
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
@@ -0,0 +1,182 @@
+# blameview.py
+import time
+from PyQt5.QtWidgets import QWidget, QVBoxLayout, QLabel, QListView, QAbstractItemView
+from PyQt5.QtCore import Qt, QAbstractListModel, QModelIndex, QSize, pyqtSignal
+from PyQt5.QtGui import QFont, QFontMetrics, QColor, QBrush
+from workers import GitWorker
+from blamereader import NULL_SHA
+
+GUTTER_WIDTH = 36  # characters: short sha, author, date
+COMMIT_BRUSHES = {}  # sha -> QBrush
+
+
+def commitBrush(sha):
+    """A dark background colour per commit, stable across runs."""
+    brush = COMMIT_BRUSHES.get(sha)
+    if brush is None:
+        if sha == NULL_SHA:
+            brush = QBrush(QColor(60, 50, 20))
+        else:
+            brush = QBrush(QColor.fromHsv(int(sha[:6], 16) % 360, 90, 70))
+        COMMIT_BRUSHES[sha] = brush
+    return brush
+
+
+class BlameModel(QAbstractListModel):
+    """
+    The lines of a file with the commit that last changed each one. Lines
+    are shown before their blame is known; every row has the same height.
+    """
+    def __init__(self, font, parent=None):
+        super().__init__(parent)
+        self.lines = []
+        self.shas = []       # per line, None until blamed
+        self.starts = set()  # first line (0-based) of each group, where the gutter is filled in
+        self.commits = {}    # sha -> BlameCommit
+        self.metrics = QFontMetrics(font)
+        self.width = 0
+        self.rowHeight = self.metrics.height() + 2
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.lines)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        row = index.row()
+        sha = self.shas[row]
+        if role == Qt.DisplayRole:
+            gutter = ""
+            if row in self.starts:
+                commit = self.commits.get(sha)
+                if sha == NULL_SHA:
+                    gutter = "(not committed)"
+                elif commit is not None:
+                    date = time.strftime("%Y-%m-%d", time.localtime(commit.time))
+                    gutter = f"{sha[:7]} {commit.author[:16]:<16} {date}"
+            return f"{gutter:<{GUTTER_WIDTH}}│ {self.lines[row].expandtabs(4)}"
+        if role == Qt.BackgroundRole:
+            return commitBrush(sha) if sha is not None else None
+        if role == Qt.ToolTipRole:
+            commit = self.commits.get(sha)
+            if commit is not None and sha != NULL_SHA:
+                return f"{sha}\n{commit.author}\n{commit.summary}"
+            return None
+        if role == Qt.SizeHintRole:
+            return QSize(self.width, self.rowHeight)
+        return None
+
+    def shaAt(self, row):
+        return self.shas[row]
+
+    def setLines(self, lines):
+        self.beginResetModel()
+        self.lines = lines
+        self.shas = [None] * len(lines)
+        self.starts = set()
+        self.commits = {}
+        longest = max((len(line.expandtabs(4)) for line in lines), default=0)
+        self.width = self.metrics.horizontalAdvance("M") * (longest + GUTTER_WIDTH + 4)
+        self.endResetModel()
+
+    def addGroups(self, groups, commits):
+        self.commits.update(commits)
+        first = len(self.lines)
+        last = -1
+        for sha, start, count in groups:
+            begin = start - 1
+            end = min(begin + count, len(self.lines))
+            self.shas[begin:end] = [sha] * (end - begin)
+            self.starts.add(begin)
+            first = min(first, begin)
+            last = max(last, end - 1)
+        if last >= first:
+            self.dataChanged.emit(self.index(first), self.index(last))
+
+
+class BlameView(QWidget):
+    """
+    Shows who last changed each line of a file. Blame streams in on a
+    worker of its own: the text appears at once and lines are coloured by
+    commit as git reports them. Double-clicking a line emits commitActivated
+    with its commit.
+    """
+    commitActivated = pyqtSignal(str)
+
+    def __init__(self, git_integration, parent=None):
+        super().__init__(parent)
+        self.git_integration = git_integration
+        self.worker = GitWorker(self)
+        self.job = None
+        self.path = None
+        self.working = False
+
+        layout = QVBoxLayout(self)
+        layout.setContentsMargins(5, 5, 5, 5)
+        self.titleLabel = QLabel("Select a file to see who changed it")
+        self.titleLabel.setStyleSheet("font-weight: bold; background-color: #2c2c2c; padding: 4px;")
+        self.titleLabel.setFixedHeight(25)
+        layout.addWidget(self.titleLabel)
+
+        font = QFont("Monospace")
+        font.setStyleHint(QFont.TypeWriter)
+        self.model = BlameModel(font, self)
+        self.view = QListView()
+        self.view.setFont(font)
+        self.view.setModel(self.model)
+        self.view.setUniformItemSizes(True)
+        self.view.setSelectionMode(QAbstractItemView.SingleSelection)
+        self.view.setStyleSheet("QListView { background-color: #1b1b1b; }")
+        self.view.doubleClicked.connect(self.onDoubleClicked)
+        layout.addWidget(self.view)
+
+    def showBlame(self, path, working=False):
+        """Blames path at HEAD, or the working tree copy with working."""
+        if (path, working) == (self.path, self.working) and self.job is not None:
+            return
+        self.stop()
+        self.path = path
+        self.working = working
+        self.titleLabel.setText(f"{path} ({'working tree' if working else 'HEAD'})")
+        job = self.worker.submit(self.git_integration.readBlame, path, working,
+                                 publishes=True, cancellable=True)
+        job.signals.partial.connect(lambda value, job=job: self.onPartial(job, value))
+        job.signals.finished.connect(lambda _result, job=job: self.onFinished(job))
+        job.signals.failed.connect(lambda error, job=job: self.onFailed(job, error))
+        self.job = job
+
+    def reload(self):
+        if self.path is not None and self.git_integration.repo:
+            path, working = self.path, self.working
+            self.path = None
+            self.showBlame(path, working)
+
+    def stop(self):
+        """Cancels the blame being read; its results are ignored."""
+        if self.job is not None:
+            self.job.cancel()
+            self.job = None
+
+    def onPartial(self, job, value):
+        if job is not self.job:
+            return
+        if value[0] == "lines":
+            self.model.setLines(value[1])
+        else:
+            self.model.addGroups(value[1], value[2])
+
+    def onFinished(self, job):
+        if job is self.job:
+            self.job = None
+
+    def onFailed(self, job, error):
+        if job is not self.job:
+            return
+        self.job = None
+        self.model.setLines([])
+        self.titleLabel.setText(f"{self.path} (error: {error})")
+
+    def onDoubleClicked(self, index):
+        sha = self.model.shaAt(index.row())
+        if sha is not None and sha != NULL_SHA:
+            self.commitActivated.emit(sha)
@@ -0,0 +1,98 @@
+# cli.py
+"""
+Headless entry point: the same status engine, history reader and caches as
+the GUI, without Qt or a display. Every command prints one JSON document.
+
+    python -m cli status [--repo DIR]
+    python -m cli graph [--repo DIR] [--max-count N] [--all]
+    python -m cli bench [--repo DIR] [--repeat N]
+"""
+import os
+import sys
+import json
+import argparse
+from gitintegration import GitIntegration
+from graphlayout import layoutGraph
+
+
+def statusCommand(git_integration, args):
+    status = git_integration.getStatus()
+    return {
+        "repository": git_integration.repo.working_tree_dir,
+        "branch": git_integration.current_branch,
+        "working": [{"path": path, "state": state} for path, state in status.working],
+        "staged": [{"path": path, "state": state} for path, state in status.staged],
+        "committed": status.committed,
+    }
+
+
+def graphCommand(git_integration, args):
+    revs = ["--all"] if args.all else ["HEAD"]
+    # Date order still lists every child before its parents, as the layout needs
+    records = list(git_integration.iterHistory(*revs, "--date-order", max_count=args.max_count))
+    positions = layoutGraph([r.sha for r in records], {r.sha: r.parents for r in records})
+    commits = []
+    for record in records:
+        lane, row = positions[record.sha]
+        commits.append({
+            "sha": record.sha, "parents": list(record.parents), "author": record.author,
+            "time": record.time, "summary": record.summary, "lane": lane, "row": row,
+        })
+    return {"repository": git_integration.repo.working_tree_dir, "commits": commits}
+
+
+def benchCommand(git_integration, args):
+    from benchmark import timeRuns
+
+    def dropGraph():
+        # Reopens the on-disk cache, as a fresh process would
+        if git_integration.commit_cache is not None:
+            git_integration.commit_cache.close()
+            git_integration.commit_cache = None
+
+    def readAll():
+        for _ in git_integration.iterHistory("--all"):
+            pass
+
+    repeat = args.repeat
+    results = {
+        "getAllFiles": timeRuns(git_integration.getAllFiles, repeat),
+        "getStatus": timeRuns(git_integration.getStatus, repeat),
+        "history (all refs)": timeRuns(readAll, repeat),
+        "commitGraph (open)": timeRuns(git_integration.commitGraph, repeat, setup=dropGraph),
+        "commitGraph (no-op)": timeRuns(git_integration.commitGraph, repeat),
+    }
+    return {"repository": git_integration.repo.working_tree_dir, "repeat": repeat, "results": results}
+
+
+COMMANDS = {"status": statusCommand, "graph": graphCommand, "bench": benchCommand}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="cli", description="Headless git DAG commands printing JSON.")
+    parser.add_argument("command", choices=sorted(COMMANDS))
+    parser.add_argument("--repo", default=".", help="repository directory (default: current directory)")
+    parser.add_argument("--max-count", type=int, default=1000, help="graph: number of commits")
+    parser.add_argument("--all", action="store_true", help="graph: all branches, remote-tracking branches and tags")
+    parser.add_argument("--repeat", type=int, default=5, help="bench: runs per measurement")
+    parser.add_argument("--indent", type=int, default=None, help="pretty-print the JSON")
+    args = parser.parse_args(argv)
+
+    git_integration = GitIntegration()
+    try:
+        git_integration.openRepository(os.path.abspath(args.repo))
+        result = COMMANDS[args.command](git_integration, args)
+    except Exception as e:
+        json.dump({"error": str(e)}, sys.stdout)
+        print()
+        return 1
+    finally:
+        if git_integration.commit_cache is not None:
+            git_integration.commit_cache.close()
+    json.dump(result, sys.stdout, indent=args.indent)
+    print()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
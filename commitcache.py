@@ -0,0 +1,251 @@
+# commitcache.py
+import os
+import heapq
+import sqlite3
+from historyreader import readHistory
+
+CACHE_FILE = "gitdag-commits.sqlite"
+SCHEMA_VERSION = 2  # 2: time is committer time
+
+
+def readTips(repo):
+    """Current ref name -> commit sha for all refs (annotated tags are peeled)."""
+    tips = {}
+    output = repo.git.for_each_ref("--format=%(objectname) %(*objectname) %(objecttype) %(refname)")
+    for line in output.splitlines():
+        sha, peeled, objtype, ref = line.split(" ", 3)
+        if objtype == "tag":
+            if not peeled:
+                continue
+            sha = peeled
+        elif objtype != "commit":
+            continue
+        tips[ref] = sha
+    if repo.head.is_valid():
+        tips["HEAD"] = repo.head.commit.hexsha
+    return tips
+
+
+class CommitCache:
+    """
+    Persistent cache of the commit DAG of one repository.
+
+    The parsed graph (sha, parents, subject, author, time) lives in a small
+    SQLite file inside the repository's .git directory and is loaded into
+    memory when opened. update() compares the current ref tips with the ones
+    stored last time and only reads commits from git that are not cached yet.
+    Commits are immutable, so entries never need to be invalidated.
+    """
+    def __init__(self, repo):
+        self.repo = repo
+        self.path = os.path.join(repo.git_dir, CACHE_FILE)
+        self.parents = {}    # sha -> tuple of parent shas
+        self.summaries = {}  # sha -> first line of the message
+        self.authors = {}    # sha -> author name
+        self.times = {}      # sha -> committer time (unix seconds)
+        self.tips = {}       # ref name -> sha, as of the last update()
+        self.db = self.openDatabase()
+        self.load()
+
+    def openDatabase(self):
+        try:
+            try:
+                return self.connect(self.path)
+            except sqlite3.OperationalError:
+                raise  # locked or not writable: the file may be fine
+            except sqlite3.DatabaseError as e:
+                # A damaged cache is worthless; start over with an empty one
+                print("Commit cache unreadable, rebuilding:", e)
+                os.remove(self.path)
+                return self.connect(self.path)
+        except (sqlite3.OperationalError, OSError) as e:
+            # Another instance holds the file, or .git is read-only: this
+            # session keeps its cache in memory and leaves the file alone
+            print("Commit cache unavailable, not saving it:", e)
+            return self.connect(":memory:")
+
+    def connect(self, path):
+        db = sqlite3.connect(path, check_same_thread=False)
+        try:
+            if db.execute("PRAGMA user_version").fetchone()[0] != SCHEMA_VERSION:
+                db.executescript("""
+                    DROP TABLE IF EXISTS commits;
+                    DROP TABLE IF EXISTS tips;
+                """)
+            db.executescript(f"""
+                CREATE TABLE IF NOT EXISTS commits (
+                    sha BLOB PRIMARY KEY,
+                    parents BLOB NOT NULL,
+                    summary TEXT NOT NULL,
+                    author TEXT NOT NULL,
+                    time INTEGER NOT NULL
+                ) WITHOUT ROWID;
+                CREATE TABLE IF NOT EXISTS tips (
+                    ref TEXT PRIMARY KEY,
+                    sha BLOB NOT NULL
+                );
+                PRAGMA user_version = {SCHEMA_VERSION};
+            """)
+            return db
+        except BaseException:
+            db.close()
+            raise
+
+    def load(self):
+        for sha, parents, summary, author, time in self.db.execute(
+                "SELECT sha, parents, summary, author, time FROM commits"):
+            sha = sha.hex()
+            self.parents[sha] = tuple(parents[i:i + 20].hex() for i in range(0, len(parents), 20))
+            self.summaries[sha] = summary
+            self.authors[sha] = author
+            self.times[sha] = time
+        self.tips = {ref: sha.hex() for ref, sha in self.db.execute("SELECT ref, sha FROM tips")}
+
+    def __contains__(self, sha):
+        return sha in self.parents
+
+    def __len__(self):
+        return len(self.parents)
+
+    def update(self):
+        """
+        Validates the cache against the current ref tips and extends it with
+        commits it does not have yet. Returns True if the tips changed.
+        """
+        tips = readTips(self.repo)
+        if tips == self.tips:
+            return False
+
+        missing = sorted({sha for sha in tips.values() if sha not in self.parents})
+        if missing:
+            # Everything reachable from tips we already know is cached, so
+            # only the history between them and the new tips has to be read.
+            # Old tips may have been garbage-collected since: git skips those.
+            known = sorted({sha for sha in list(tips.values()) + list(self.tips.values())
+                            if sha in self.parents})
+            revs = missing + (["--not"] + known if known else [])
+            self.addRecords(readHistory(self.repo, *revs, extra_args=("--ignore-missing",)))
+
+        with self.db:
+            self.db.execute("DELETE FROM tips")
+            self.db.executemany("INSERT INTO tips (ref, sha) VALUES (?, ?)",
+                                [(ref, bytes.fromhex(sha)) for ref, sha in tips.items()])
+        self.tips = tips
+        return True
+
+    def addRecords(self, records):
+        """
+        Stores new CommitRecords, writing them to disk in batches within one
+        transaction. An interrupted import is undone on disk and in memory:
+        update() treats cached tips as complete, so it must never find a
+        commit whose ancestors were not stored.
+        """
+        added = []
+        rows = []
+        try:
+            with self.db:
+                for record in records:
+                    sha = record.sha
+                    if sha in self.parents:
+                        continue
+                    self.parents[sha] = record.parents
+                    self.summaries[sha] = record.summary
+                    self.authors[sha] = record.author
+                    self.times[sha] = record.time
+                    added.append(sha)
+                    rows.append((bytes.fromhex(sha), bytes.fromhex("".join(record.parents)),
+                                 record.summary, record.author, record.time))
+                    if len(rows) >= 10000:
+                        self.writeRows(rows)
+                        rows = []
+                if rows:
+                    self.writeRows(rows)
+        except BaseException:
+            for sha in added:
+                del self.parents[sha], self.summaries[sha], self.authors[sha], self.times[sha]
+            raise
+
+    def writeRows(self, rows):
+        # Part of the caller's transaction
+        self.db.executemany(
+            "INSERT OR IGNORE INTO commits (sha, parents, summary, author, time) VALUES (?, ?, ?, ?, ?)",
+            rows)
+
+    def walk(self, tips):
+        """A HistoryWalk over the shas reachable from the given tip shas."""
+        return HistoryWalk(self, tips)
+
+    def close(self):
+        self.db.close()
+
+
+class HistoryPage:
+    """
+    The newest commits of a repository, read straight from git for a first
+    screen while its CommitCache loads: reading count commits costs the same
+    however deep the history is. Offers the tips, commit dicts and walk() of
+    a CommitCache, but the dicts only fill up as walk() reads the page.
+    """
+    def __init__(self, repo, count):
+        self.repo = repo
+        self.count = count
+        self.parents = {}
+        self.summaries = {}
+        self.authors = {}
+        self.times = {}
+        self.tips = readTips(repo)
+
+    def __len__(self):
+        return len(self.parents)
+
+    def walk(self, tips):
+        """A HistoryWalk over the newest count commits reachable from tips."""
+        for record in readHistory(self.repo, *tips, max_count=self.count, extra_args=("--date-order",)):
+            self.parents[record.sha] = record.parents
+            self.summaries[record.sha] = record.summary
+            self.authors[record.sha] = record.author
+            self.times[record.sha] = record.time
+        return HistoryWalk(self, tips)
+
+
+class HistoryWalk:
+    """
+    Iterates the shas reachable from some tips like `git log --date-order`:
+    newest first, but never a commit before all of its children, whatever
+    their dates say. Parents that are not cached (shallow clones) are
+    skipped. Creating the walk visits every reachable commit once; total is
+    the number of shas it yields.
+    """
+    def __init__(self, cache, tips):
+        self.parents = parents = cache.parents
+        self.times = cache.times
+        # Count the children each reachable commit has to wait for
+        self.pending = pending = {}
+        stack = [sha for sha in set(tips) if sha in parents]
+        seen = set(stack)
+        while stack:
+            for parent in parents[stack.pop()]:
+                if parent in parents:
+                    pending[parent] = pending.get(parent, 0) + 1
+                    if parent not in seen:
+                        seen.add(parent)
+                        stack.append(parent)
+        self.total = len(seen)
+        self.heap = [(-self.times[sha], sha) for sha in seen if sha not in pending]
+        heapq.heapify(self.heap)
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        if not self.heap:
+            raise StopIteration
+        _, sha = heapq.heappop(self.heap)
+        pending = self.pending
+        for parent in self.parents[sha]:
+            if parent in pending:
+                pending[parent] -= 1
+                if not pending[parent]:
+                    del pending[parent]
+                    heapq.heappush(self.heap, (-self.times[parent], parent))
+        return sha
@@ -0,0 +1,107 @@
+# commitsearch.py
+import re
+import time
+import bisect
+
+WORD_RE = re.compile(r"\w+")
+TERM_RE = re.compile(r'(?:(author|after|before):)?("[^"]*"?|\S+)')
+HEX_RE = re.compile(r"[0-9a-f]{4,40}\Z")
+
+
+class CommitSearchIndex:
+    """
+    In-memory search index over commits.
+
+    Query terms are combined with AND:
+    - word           commits whose message has a word starting with it, or
+                     whose sha starts with it (4+ hex digits)
+    - "some phrase"  substring of the message subject; so is an unquoted
+                     term that is not a single word, like bug-123 or fix:
+    - author:name    substring of the author name
+    - after:YYYY-MM-DD / before:YYYY-MM-DD   commit date range
+    Sha prefixes and words are answered by bisecting sorted keys, so lookups
+    stay in the millisecond range for 100k commits. add() is incremental.
+    """
+    def __init__(self):
+        self.shas = []        # sorted shas
+        self.words = []       # sorted distinct lowercase words
+        self.word_shas = {}   # word -> set of shas
+        self.subjects = {}    # sha -> lowercase subject
+        self.authors = {}     # sha -> lowercase author
+        self.dates = []       # sorted (time, sha)
+
+    def __len__(self):
+        return len(self.subjects)
+
+    def __contains__(self, sha):
+        return sha in self.subjects
+
+    def add(self, records):
+        """Indexes (sha, subject, author, time) records; known shas are skipped."""
+        new_shas = []
+        new_words = set()
+        new_dates = []
+        for sha, subject, author, when in records:
+            if sha in self.subjects:
+                continue
+            subject = subject.lower()
+            self.subjects[sha] = subject
+            self.authors[sha] = author.lower()
+            new_shas.append(sha)
+            new_dates.append((when, sha))
+            for word in set(WORD_RE.findall(subject)):
+                shas = self.word_shas.get(word)
+                if shas is None:
+                    self.word_shas[word] = {sha}
+                    new_words.add(word)
+                else:
+                    shas.add(sha)
+        if not new_shas:
+            return
+        # Re-sorting nearly sorted lists is linear in Python's timsort
+        self.shas.extend(new_shas)
+        self.shas.sort()
+        self.words.extend(new_words)
+        self.words.sort()
+        self.dates.extend(new_dates)
+        self.dates.sort()
+
+    def prefixRange(self, keys, prefix):
+        start = bisect.bisect_left(keys, prefix)
+        end = bisect.bisect_left(keys, prefix + "\uffff")
+        return keys[start:end]
+
+    def matchWord(self, term):
+        matches = set()
+        for word in self.prefixRange(self.words, term):
+            matches |= self.word_shas[word]
+        if HEX_RE.match(term):
+            matches.update(self.prefixRange(self.shas, term))
+        return matches
+
+    def matchDate(self, value, after):
+        try:
+            stamp = int(time.mktime(time.strptime(value, "%Y-%m-%d")))
+        except ValueError:
+            return set()
+        if after:
+            return {sha for _, sha in self.dates[bisect.bisect_left(self.dates, (stamp, "")):]}
+        return {sha for _, sha in self.dates[:bisect.bisect_left(self.dates, (stamp, ""))]}
+
+    def search(self, query):
+        """Returns the set of shas matching every term of query, or None for an empty query."""
+        result = None
+        for field, value in TERM_RE.findall(query.strip().lower()):
+            if field == "author":
+                matches = {sha for sha, author in self.authors.items() if value.strip('"') in author}
+            elif field in ("after", "before"):
+                matches = self.matchDate(value, field == "after")
+            elif value.startswith('"') or not WORD_RE.fullmatch(value):
+                phrase = value.strip('"')
+                matches = {sha for sha, subject in self.subjects.items() if phrase in subject}
+            else:
+                matches = self.matchWord(value)
+            result = matches if result is None else result & matches
+            if not result:
+                break
+        return result
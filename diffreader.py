@@ -0,0 +1,134 @@
+# diffreader.py
+import hashlib
+from collections import OrderedDict
+from git.exc import GitCommandError
+
+# Which side of a file a diff compares
+WORKING = "working"      # index -> working tree (untracked: nothing -> working tree)
+STAGED = "staged"        # HEAD -> index
+COMMITTED = "committed"  # HEAD's parent -> HEAD
+
+# Kinds of diff lines
+HEADER = "header"    # diff --git, index, ---/+++ and similar
+HUNK = "hunk"        # @@ -a,b +c,d @@
+ADDED = "added"
+REMOVED = "removed"
+CONTEXT = "context"
+NOTE = "note"        # "\ No newline at end of file"
+
+NULL_SHA = "0" * 40
+
+
+class Hunk:
+    """One hunk of a diff as (kind, text) lines; the file header is a hunk of its own."""
+    __slots__ = ("lines",)
+
+    def __init__(self, lines):
+        self.lines = lines
+
+    def __len__(self):
+        return len(self.lines)
+
+
+def lineKind(line):
+    first = line[:1]
+    if first == "+":
+        return ADDED
+    if first == "-":
+        return REMOVED
+    if first == " " or not line:
+        return CONTEXT
+    if first == "\\":
+        return NOTE
+    return HEADER
+
+
+def parseDiffStream(stream, cancel=None):
+    """
+    Lazily parses a unified diff byte stream into Hunks, yielding each hunk
+    as soon as the next one starts. Stops early once cancel is set.
+    """
+    lines = []
+    in_hunk = False
+    for raw in iter(stream.readline, b""):
+        if cancel is not None and cancel.is_set():
+            return
+        line = raw.decode("utf-8", errors="replace").rstrip("\r\n")
+        if line.startswith("@@"):
+            if lines:
+                yield Hunk(lines)
+            lines = [(HUNK, line)]
+            in_hunk = True
+        elif in_hunk and line.startswith("diff --git"):
+            # Next file of a multi-file diff
+            yield Hunk(lines)
+            lines = [(HEADER, line)]
+            in_hunk = False
+        else:
+            lines.append((lineKind(line) if in_hunk else HEADER, line))
+    if lines:
+        yield Hunk(lines)
+
+
+def streamDiff(proc, cancel=None, ok_status=(0,)):
+    """
+    Yields the Hunks of a GitPython process started with as_process=True and
+    stops the process when the consumer is done early or cancel is set.
+    ok_status lists exit codes that are not errors (`diff --no-index` exits 1
+    when the files differ).
+    """
+    finished = False
+    try:
+        yield from parseDiffStream(proc.stdout, cancel)
+        finished = cancel is None or not cancel.is_set()
+    finally:
+        if not finished:
+            proc.proc.terminate()
+            proc.proc.wait()
+        else:
+            try:
+                proc.wait()
+            except GitCommandError as e:
+                if e.status not in ok_status:
+                    raise
+
+
+def blobSha(path):
+    """The sha git would give the file's content as a blob, or None if unreadable."""
+    try:
+        with open(path, "rb") as f:
+            data = f.read()
+    except OSError:
+        return None
+    return hashlib.sha1(b"blob %d\0" % len(data) + data).hexdigest()
+
+
+class DiffCache:
+    """
+    LRU cache of parsed diffs keyed by (path, old blob sha, new blob sha) as
+    returned by GitIntegration.diffKey(), bounded by the total number of
+    lines it holds.
+    """
+    def __init__(self, max_lines=200000):
+        self.max_lines = max_lines
+        self.lines = 0
+        self.entries = OrderedDict()  # key -> [Hunk]
+
+    def get(self, key):
+        hunks = self.entries.get(key)
+        if hunks is not None:
+            self.entries.move_to_end(key)
+        return hunks
+
+    def put(self, key, hunks):
+        size = sum(len(h) for h in hunks)
+        if size > self.max_lines:
+            return
+        old = self.entries.pop(key, None)
+        if old is not None:
+            self.lines -= sum(len(h) for h in old)
+        self.entries[key] = hunks
+        self.lines += size
+        while self.lines > self.max_lines:
+            _, evicted = self.entries.popitem(last=False)
+            self.lines -= sum(len(h) for h in evicted)
@@ -0,0 +1,172 @@
+# diffview.py
+from PyQt5.QtWidgets import QWidget, QVBoxLayout, QLabel, QListView, QAbstractItemView
+from PyQt5.QtCore import Qt, QAbstractListModel, QModelIndex, QSize
+from PyQt5.QtGui import QFont, QFontMetrics, QColor, QBrush
+from workers import GitWorker
+from diffreader import HEADER, HUNK, ADDED, REMOVED, NOTE, WORKING, STAGED, COMMITTED
+
+MODE_TITLES = {WORKING: "Working tree", STAGED: "Staged", COMMITTED: "Last commit"}
+
+LINE_BACKGROUNDS = {
+    ADDED: QBrush(QColor(30, 58, 30)),
+    REMOVED: QBrush(QColor(64, 30, 30)),
+    HUNK: QBrush(QColor(32, 40, 56)),
+}
+LINE_FOREGROUNDS = {
+    ADDED: QBrush(QColor(180, 230, 180)),
+    REMOVED: QBrush(QColor(240, 180, 180)),
+    HUNK: QBrush(QColor(120, 170, 220)),
+    HEADER: QBrush(QColor(150, 150, 150)),
+    NOTE: QBrush(QColor(130, 130, 130)),
+}
+
+
+class DiffModel(QAbstractListModel):
+    """
+    Diff lines as rows. Hunks are appended as they arrive; every row has the
+    same size, so the view only lays out and paints the visible lines.
+    """
+    def __init__(self, font, parent=None):
+        super().__init__(parent)
+        self.lines = []  # (kind, text)
+        self.metrics = QFontMetrics(font)
+        self.width = 0
+        self.rowHeight = self.metrics.height() + 2
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.lines)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        kind, text = self.lines[index.row()]
+        if role == Qt.DisplayRole:
+            return text.expandtabs(4)
+        if role == Qt.BackgroundRole:
+            return LINE_BACKGROUNDS.get(kind)
+        if role == Qt.ForegroundRole:
+            return LINE_FOREGROUNDS.get(kind)
+        if role == Qt.SizeHintRole:
+            # The widest line so far, so the horizontal scrollbar covers it
+            return QSize(self.width, self.rowHeight)
+        return None
+
+    def clear(self):
+        self.beginResetModel()
+        self.lines = []
+        self.width = 0
+        self.endResetModel()
+
+    def appendHunks(self, hunks):
+        new_lines = [line for hunk in hunks for line in hunk.lines]
+        if not new_lines:
+            return
+        longest = max(len(text.expandtabs(4)) for _, text in new_lines)
+        width = self.metrics.horizontalAdvance("M") * (longest + 2)
+        first = len(self.lines)
+        self.beginInsertRows(QModelIndex(), first, first + len(new_lines) - 1)
+        self.lines.extend(new_lines)
+        self.endInsertRows()
+        if width > self.width:
+            self.width = width
+            # Uniform item sizes are taken from one row; relayout for the new width
+            self.layoutAboutToBeChanged.emit()
+            self.layoutChanged.emit()
+
+
+class DiffView(QWidget):
+    """
+    Shows the diff of one file. Diffs are read on a worker of their own, so
+    a large diff never delays status refreshes or staging, and lines appear
+    while git is still producing them. Selecting another file cancels the
+    diff still being read.
+    """
+    def __init__(self, git_integration, parent=None):
+        super().__init__(parent)
+        self.git_integration = git_integration
+        self.worker = GitWorker(self)
+        self.job = None
+        self.path = None
+        self.mode = None
+        self.shownKey = None
+        self.replacePending = False
+
+        layout = QVBoxLayout(self)
+        layout.setContentsMargins(5, 5, 5, 5)
+        self.titleLabel = QLabel("Select a file to see its changes")
+        self.titleLabel.setStyleSheet("font-weight: bold; background-color: #2c2c2c; padding: 4px;")
+        self.titleLabel.setFixedHeight(25)
+        layout.addWidget(self.titleLabel)
+
+        font = QFont("Monospace")
+        font.setStyleHint(QFont.TypeWriter)
+        self.model = DiffModel(font, self)
+        self.view = QListView()
+        self.view.setFont(font)
+        self.view.setModel(self.model)
+        self.view.setUniformItemSizes(True)
+        self.view.setSelectionMode(QAbstractItemView.ExtendedSelection)
+        self.view.setHorizontalScrollBarPolicy(Qt.ScrollBarAsNeeded)
+        self.view.setStyleSheet("QListView { background-color: #1b1b1b; }")
+        layout.addWidget(self.view)
+
+    def showDiff(self, path, mode):
+        """Shows the diff of path; mode is WORKING, STAGED or COMMITTED."""
+        self.path = path
+        self.mode = mode
+        self.shownKey = None
+        self.model.clear()
+        self.titleLabel.setText(f"{MODE_TITLES[mode]}: {path}")
+        self.load()
+
+    def reload(self):
+        """Re-reads the shown diff after a change; the lines stay until the new ones arrive."""
+        if self.path is not None and self.git_integration.repo:
+            self.load()
+
+    def load(self):
+        if self.job is not None:
+            self.job.cancel()
+        self.replacePending = self.shownKey is not None
+        job = self.worker.submit(self.git_integration.readDiff, self.path, self.mode, self.shownKey,
+                                 publishes=True, cancellable=True)
+        job.signals.partial.connect(lambda hunks, job=job: self.onHunks(job, hunks))
+        job.signals.finished.connect(lambda result, job=job: self.onFinished(job, result))
+        job.signals.failed.connect(lambda error, job=job: self.onFailed(job, error))
+        self.job = job
+
+    def stop(self):
+        """Cancels the diff being read; its results are ignored."""
+        if self.job is not None:
+            self.job.cancel()
+            self.job = None
+
+    def onHunks(self, job, hunks):
+        if job is not self.job:
+            return  # a diff that is no longer wanted
+        if self.replacePending:
+            self.replacePending = False
+            self.model.clear()
+        self.model.appendHunks(hunks)
+
+    def onFinished(self, job, result):
+        if job is not self.job:
+            return
+        self.job = None
+        key, hunks = result
+        if hunks is None:
+            return
+        if self.replacePending and key != self.shownKey:
+            self.model.clear()  # the file no longer differs
+        self.replacePending = False
+        self.shownKey = key
+        title = f"{MODE_TITLES[self.mode]}: {self.path}"
+        self.titleLabel.setText(title if self.model.rowCount() else title + " (no changes)")
+
+    def onFailed(self, job, error):
+        if job is not self.job:
+            return
+        self.job = None
+        self.replacePending = False
+        self.model.clear()
+        self.titleLabel.setText(f"{MODE_TITLES[self.mode]}: {self.path} (error: {error})")
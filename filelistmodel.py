@@ -0,0 +1,136 @@
+# filelistmodel.py
+from PyQt5.QtWidgets import QStyledItemDelegate, QStyleOptionViewItem, QStyle, QApplication
+from PyQt5.QtCore import Qt, QAbstractListModel, QModelIndex, QRect, QSize, QEvent, pyqtSignal
+from PyQt5.QtGui import QFont, QColor
+
+PathRole = Qt.UserRole + 1
+IconRole = Qt.UserRole + 2
+
+ROW_HEIGHT = 28
+BUTTON_SIZE = 24
+
+
+class FileListModel(QAbstractListModel):
+    """
+    Flat list of (path, icon) entries sorted by path.
+
+    setEntries() diffs the new list against the current one and emits row
+    removals, insertions and icon changes instead of a model reset, so views
+    keep their scroll position and selection and only touched rows repaint.
+    """
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.entries = []
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.entries)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        path, icon = self.entries[index.row()]
+        if role == Qt.DisplayRole:
+            return f"{icon} {path}"
+        if role == PathRole:
+            return path
+        if role == IconRole:
+            return icon
+        return None
+
+    def pathAt(self, row):
+        return self.entries[row][0]
+
+    def setEntries(self, entries):
+        new_paths = {path for path, _ in entries}
+
+        # Drop rows whose path disappeared, in contiguous runs from the bottom
+        row = len(self.entries) - 1
+        while row >= 0:
+            if self.entries[row][0] in new_paths:
+                row -= 1
+                continue
+            end = row
+            while row >= 0 and self.entries[row][0] not in new_paths:
+                row -= 1
+            self.beginRemoveRows(QModelIndex(), row + 1, end)
+            del self.entries[row + 1:end + 1]
+            self.endRemoveRows()
+
+        # What is left is a subsequence of the new list: merge in the new
+        # rows and update icons that changed
+        row = 0
+        i = 0
+        while i < len(entries):
+            path, icon = entries[i]
+            if row < len(self.entries) and self.entries[row][0] == path:
+                if self.entries[row][1] != icon:
+                    self.entries[row] = (path, icon)
+                    index = self.index(row)
+                    self.dataChanged.emit(index, index, [Qt.DisplayRole, IconRole])
+                row += 1
+                i += 1
+                continue
+            start = i
+            while i < len(entries) and (row >= len(self.entries) or entries[i][0] != self.entries[row][0]):
+                i += 1
+            self.beginInsertRows(QModelIndex(), row, row + i - start - 1)
+            self.entries[row:row] = entries[start:i]
+            self.endInsertRows()
+            row += i - start
+
+
+class FileItemDelegate(QStyledItemDelegate):
+    """
+    Paints a file row (icon, path and a small +/- button) directly, so a list
+    costs nothing per row beyond its model entry. Clicks on the button are
+    reported through buttonClicked(path).
+    """
+    buttonClicked = pyqtSignal(str)
+
+    font = None
+
+    def __init__(self, button_text="", parent=None):
+        super().__init__(parent)
+        self.button_text = button_text
+        if FileItemDelegate.font is None:
+            FileItemDelegate.font = QFont("Segoe UI Emoji", 11)
+
+    def buttonRect(self, rect):
+        return QRect(rect.right() - BUTTON_SIZE - 2, rect.top() + (rect.height() - BUTTON_SIZE) // 2,
+                     BUTTON_SIZE, BUTTON_SIZE)
+
+    def sizeHint(self, option, index):
+        return QSize(option.rect.width(), ROW_HEIGHT)
+
+    def paint(self, painter, option, index):
+        opt = QStyleOptionViewItem(option)
+        self.initStyleOption(opt, index)
+        opt.text = ""
+        style = opt.widget.style() if opt.widget else QApplication.style()
+        # Background, selection and focus
+        style.drawControl(QStyle.CE_ItemViewItem, opt, painter, opt.widget)
+
+        painter.save()
+        painter.setFont(self.font)
+        painter.setPen(QColor("#e0e0e0"))
+        textRect = opt.rect.adjusted(4, 0, -(BUTTON_SIZE + 8), 0)
+        text = painter.fontMetrics().elidedText(index.data(Qt.DisplayRole), Qt.ElideMiddle, textRect.width())
+        painter.drawText(textRect, Qt.AlignLeft | Qt.AlignVCenter, text)
+
+        buttonRect = self.buttonRect(opt.rect)
+        painter.setPen(QColor("#444"))
+        painter.setBrush(QColor("#3c3c3c"))
+        painter.drawRect(buttonRect)
+        if self.button_text:
+            painter.setPen(QColor("#e0e0e0"))
+            painter.drawText(buttonRect, Qt.AlignCenter, self.button_text)
+        painter.restore()
+
+    def editorEvent(self, event, model, option, index):
+        if (self.button_text and event.type() in (QEvent.MouseButtonPress, QEvent.MouseButtonRelease)
+                and event.button() == Qt.LeftButton
+                and self.buttonRect(option.rect).contains(event.pos())):
+            if event.type() == QEvent.MouseButtonRelease:
+                self.buttonClicked.emit(index.data(PathRole))
+            return True
+        return super().editorEvent(event, model, option, index)
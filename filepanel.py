@@ -1,18 +1,35 @@
 # filepanel.py
 from PyQt5.QtWidgets import (
-    QWidget, QVBoxLayout, QHBoxLayout, QListWidget,
-    QListWidgetItem, QPushButton, QInputDialog, QLabel
+    QWidget, QVBoxLayout, QHBoxLayout, QListView, QAbstractItemView,
+    QPushButton, QInputDialog, QLabel, QMenu
 )
+import posixpath
 from PyQt5.QtCore import pyqtSignal, Qt
-from functools import partial
-from fileitemwidget import FileItemWidget
+from filelistmodel import FileListModel, FileItemDelegate
+from workers import CoalescedRefresh
+from perf import timed, addItems
+import diffreader
+from repostatus import RepoStatus, UNMODIFIED, MODIFIED, UNTRACKED, STAGED, STAGED_MODIFIED
+
+STATE_ICONS = {
+    UNMODIFIED: "✅",
+    MODIFIED: "✏️",
+    UNTRACKED: "🆕",
+    STAGED: "✔",
+    STAGED_MODIFIED: "✏️",
+}
 
 class FilePanel(QWidget):
     commitRequested = pyqtSignal(str)  # Emitted when user commits staged files
+    fileSelected = pyqtSignal(str, str)  # path, diff mode of the list it was selected in
+    blameRequested = pyqtSignal(str, bool)  # path, whether to blame the working tree copy
 
-    def __init__(self, git_integration, parent=None):
+    def __init__(self, git_integration, worker, parent=None):
         super().__init__(parent)
         self.git_integration = git_integration
+        self.worker = worker
+        # Status is computed on the worker and applied to the lists afterwards
+        self.statusLoader = CoalescedRefresh(worker, self.git_integration.getStatus, self.applyStatus)
 
         mainLayout = QVBoxLayout(self)
         mainLayout.setContentsMargins(5, 5, 5, 5)
@@ -39,12 +56,37 @@ class FilePanel(QWidget):
 
         # Horizontal layout for the lists
         topListLayout = QHBoxLayout()
-        self.workingList = QListWidget()
-        self.stagingList = QListWidget()
+        self.workingModel = FileListModel(self)
+        self.workingDelegate = FileItemDelegate("+", self)
+        self.workingDelegate.buttonClicked.connect(self.onStageFile)
+        self.workingList = self.createListView(self.workingModel, self.workingDelegate)
+
+        self.stagingModel = FileListModel(self)
+        self.stagingDelegate = FileItemDelegate("-", self)
+        self.stagingDelegate.buttonClicked.connect(self.onUnstageFile)
+        self.stagingList = self.createListView(self.stagingModel, self.stagingDelegate)
         topListLayout.addWidget(self.workingList)
         topListLayout.addWidget(self.stagingList)
         row1Layout.addLayout(topListLayout)
 
+        self.workingList.setContextMenuPolicy(Qt.CustomContextMenu)
+        self.workingList.customContextMenuRequested.connect(self.onWorkingContextMenu)
+        self.stagingList.setContextMenuPolicy(Qt.CustomContextMenu)
+        self.stagingList.customContextMenuRequested.connect(self.onStagingContextMenu)
+
+        # Batch actions over the selection
+        batchLayout = QHBoxLayout()
+        self.stageSelectedButton = QPushButton("Stage Selected")
+        self.stageSelectedButton.clicked.connect(self.onStageSelected)
+        self.stageAllButton = QPushButton("Stage All")
+        self.stageAllButton.clicked.connect(self.onStageAll)
+        self.unstageSelectedButton = QPushButton("Unstage Selected")
+        self.unstageSelectedButton.clicked.connect(self.onUnstageSelected)
+        for btn in (self.stageSelectedButton, self.stageAllButton, self.unstageSelectedButton):
+            btn.setFixedHeight(26)
+            batchLayout.addWidget(btn)
+        row1Layout.addLayout(batchLayout)
+
         # Commit button
         self.commitButton = QPushButton("Commit Staged")
         self.commitButton.setFixedHeight(30)
@@ -61,7 +103,16 @@ class FilePanel(QWidget):
         self.committedLabel.setFixedHeight(25)
         row2Layout.addWidget(self.committedLabel)
 
-        self.committedList = QListWidget()
+        self.committedModel = FileListModel(self)
+        self.committedDelegate = FileItemDelegate("", self)
+        self.committedList = self.createListView(self.committedModel, self.committedDelegate)
+        self.committedList.setContextMenuPolicy(Qt.CustomContextMenu)
+        self.committedList.customContextMenuRequested.connect(self.onCommittedContextMenu)
+
+        for view, mode in ((self.workingList, diffreader.WORKING), (self.stagingList, diffreader.STAGED),
+                           (self.committedList, diffreader.COMMITTED)):
+            view.selectionModel().currentChanged.connect(
+                lambda current, _previous, view=view, mode=mode: self.onCurrentChanged(view, mode, current))
         row2Layout.addWidget(self.committedList)
 
         mainLayout.addWidget(row1Widget, stretch=3)
@@ -72,7 +123,7 @@ class FilePanel(QWidget):
                 background-color: #202020;
                 color: #e0e0e0;
             }
-            QListWidget {
+            QListView {
                 background-color: #2c2c2c;
                 color: #e0e0e0;
                 border: 1px solid #444;
@@ -87,89 +138,94 @@ class FilePanel(QWidget):
             }
         """)
 
-    def refreshStatus(self):
-        # Clear everything
-        self.workingList.clear()
-        self.stagingList.clear()
-        self.committedList.clear()
+    def createListView(self, model, delegate):
+        view = QListView()
+        view.setModel(model)
+        view.setItemDelegate(delegate)
+        # Every row has the same height, so the view never measures rows it does not show
+        view.setUniformItemSizes(True)
+        view.setSelectionMode(QAbstractItemView.ExtendedSelection)
+        return view
 
-        repo = self.git_integration.repo
-        if not repo or not repo.working_tree_dir:
-            return
+    def onCurrentChanged(self, view, mode, current):
+        if current.isValid():
+            self.fileSelected.emit(view.model().pathAt(current.row()), mode)
 
-        all_files = self.git_integration.getAllFiles()
-
-        # Identify modified/untracked
-        working_files = set()
-        try:
-            diff_working = repo.index.diff(None)
-            for diff in diff_working:
-                working_files.add(diff.a_path)
-        except Exception as e:
-            print("Error getting working diff:", e)
-        for f in repo.untracked_files:
-            working_files.add(f)
-
-        # Populate Working Directory
-        for f in sorted(all_files):
-            if f in working_files:
-                icon = "✏️" if f not in repo.untracked_files else "🆕"
-            else:
-                icon = "✅"
-            item = QListWidgetItem()
-            widget = FileItemWidget(f, "working", icon, font_size=11)
-            widget.stageRequested.connect(partial(self.onStageFile, f))
-            item.setSizeHint(widget.sizeHint())
-            self.workingList.addItem(item)
-            self.workingList.setItemWidget(item, widget)
-
-        # Staging
-        staging_files = set()
-        if repo.head.is_valid():
-            try:
-                diff_staged = repo.index.diff("HEAD")
-                for diff in diff_staged:
-                    staging_files.add(diff.a_path)
-            except Exception as e:
-                print("Error getting staged diff:", e)
-        else:
-            staging_files = {key[0] for key in repo.index.entries.keys()}
-
-        diff_from_index = {d.a_path for d in repo.index.diff(None)}
-        for f in sorted(staging_files):
-            icon = "✏️" if f in diff_from_index else "✔"
-            item = QListWidgetItem()
-            widget = FileItemWidget(f, "staged", icon, font_size=11)
-            widget.unstageRequested.connect(partial(self.onUnstageFile, f))
-            item.setSizeHint(widget.sizeHint())
-            self.stagingList.addItem(item)
-            self.stagingList.setItemWidget(item, widget)
-
-        # Committed (files from last commit)
-        committed_files = set()
-        if repo.head.is_valid():
-            commit = repo.head.commit
-            if commit.parents:
-                diff_committed = commit.diff(commit.parents[0])
-                for diff in diff_committed:
-                    committed_files.add(diff.a_path)
-            else:
-                committed_files = set()
-        for f in sorted(committed_files):
-            item = QListWidgetItem()
-            widget = FileItemWidget(f, "committed", "✓", font_size=11)
-            widget.stageButton.setEnabled(False)
-            item.setSizeHint(widget.sizeHint())
-            self.committedList.addItem(item)
-            self.committedList.setItemWidget(item, widget)
+    def selectedPaths(self, view):
+        return [view.model().pathAt(index.row()) for index in view.selectionModel().selectedRows()]
+
+    def refreshStatus(self):
+        self.statusLoader.request()
+
+    @timed
+    def applyStatus(self, status):
+        if status is None:
+            status = RepoStatus([], [], [])
+        addItems(len(status.working) + len(status.staged))
+        # The models only insert, remove or repaint the rows that changed
+        self.workingModel.setEntries([(f, STATE_ICONS[state]) for f, state in status.working])
+        self.stagingModel.setEntries([(f, STATE_ICONS[state]) for f, state in status.staged])
+        self.committedModel.setEntries([(f, "✓") for f in status.committed])
+
+    def runBatch(self, fn, *args):
+        """Runs a staging operation on the worker, then applies one incremental status update."""
+        job = self.worker.submit(fn, *args)
+        job.signals.finished.connect(lambda _result: self.refreshStatus())
 
     def onStageFile(self, file):
-        self.git_integration.stageFile(file)
-        self.refreshStatus()
+        # The row button acts on the whole selection when its row is part of it
+        selected = self.selectedPaths(self.workingList)
+        self.runBatch(self.git_integration.stageFiles, selected if file in selected else [file])
 
     def onUnstageFile(self, file):
-        self.git_integration.unstageFile(file)
-        self.refreshStatus()
+        selected = self.selectedPaths(self.stagingList)
+        self.runBatch(self.git_integration.unstageFiles, selected if file in selected else [file])
+
+    def onStageSelected(self):
+        self.runBatch(self.git_integration.stageFiles, self.selectedPaths(self.workingList))
+
+    def onUnstageSelected(self):
+        self.runBatch(self.git_integration.unstageFiles, self.selectedPaths(self.stagingList))
+
+    def onStageAll(self):
+        self.runBatch(self.git_integration.stageAll)
+
+    def onStageDirectory(self, directory):
+        self.runBatch(self.git_integration.stageFiles, [directory])
+
+    def onWorkingContextMenu(self, pos):
+        index = self.workingList.indexAt(pos)
+        menu = QMenu(self)
+        menu.addAction("Stage Selected", self.onStageSelected)
+        if index.isValid():
+            directory = posixpath.dirname(self.workingModel.pathAt(index.row()))
+            if directory:
+                menu.addAction(f"Stage Directory '{directory}/'", lambda: self.onStageDirectory(directory))
+        menu.addAction("Stage All", self.onStageAll)
+        self.addBlameAction(menu, self.workingList, index, True)
+        menu.exec_(self.workingList.viewport().mapToGlobal(pos))
+
+    def onStagingContextMenu(self, pos):
+        index = self.stagingList.indexAt(pos)
+        menu = QMenu(self)
+        menu.addAction("Unstage Selected", self.onUnstageSelected)
+        self.addBlameAction(menu, self.stagingList, index, True)
+        menu.exec_(self.stagingList.viewport().mapToGlobal(pos))
+
+    def onCommittedContextMenu(self, pos):
+        index = self.committedList.indexAt(pos)
+        if not index.isValid():
+            return
+        menu = QMenu(self)
+        self.addBlameAction(menu, self.committedList, index, False)
+        menu.exec_(self.committedList.viewport().mapToGlobal(pos))
+
+    def addBlameAction(self, menu, view, index, working):
+        # Changed files are blamed as they are on disk, committed ones at HEAD
+        if index.isValid():
+            path = view.model().pathAt(index.row())
+            menu.addSeparator()
+            menu.addAction("Blame", lambda: self.blameRequested.emit(path, working))
 
     def onCommitButtonClicked(self):
         commit_message, ok = QInputDialog.getText(self, "Commit", "Enter commit message:")
@@ -1,86 +1,360 @@
 # gitintegration.py
 import os
+import sys
+import tempfile
+import threading
 from git import Repo
-from PyQt5.QtWidgets import QMessageBox
+from commitcache import CommitCache, HistoryPage
+from historyreader import readHistory
+from blamereader import BlameCache, streamBlame
+from diffreader import DiffCache, streamDiff, blobSha, WORKING, STAGED, COMMITTED, NULL_SHA
+from perf import timed
+from repostatus import parseStatus
+import remoteops
 
 IGNORED_FOLDERS = {".venv", "venv", "node_modules", ".git", "__pycache__"}
 
+# Todo list actions the rebase planner can use
+REBASE_ACTIONS = ("pick", "squash", "fixup", "drop")
+
+
+def rebasePlanError(plan):
+    """Why a rebase plan of (action, sha) cannot run, or None if it can."""
+    kept = [action for action, _ in plan if action != "drop"]
+    if kept and kept[0] in ("squash", "fixup"):
+        return "The first kept commit has nothing to be squashed into."
+    return None
+
+# `git hash-object -t tree /dev/null`, to diff against before the first commit
+EMPTY_TREE = "4b825dc642cb6eb9a060e54bf8d69288fbee4904"
+
+# What HEAD committed: a merge against its first parent, the first commit
+# against the empty tree. diff-tree prints nothing for merges otherwise.
+COMMITTED_ARGS = ("--diff-merges=first-parent", "--root", "-r", "--no-commit-id")
+
 class GitIntegration:
     def __init__(self):
-        self.repo = None
+        self.directory = None  # the current repository; see repo
+        self.local = threading.local()
         self.current_branch = "main"
+        self.commit_cache = None
+        self.diff_cache = DiffCache()  # only used from the diff worker thread
+        self.blame_cache = BlameCache()  # only used from the blame worker thread
 
-    def createRepository(self, parent_widget):
-        from PyQt5.QtWidgets import QFileDialog
-        directory = QFileDialog.getExistingDirectory(parent_widget, "Select Directory for New Repository")
-        if directory:
-            try:
-                self.repo = Repo.init(directory)
-                self.current_branch = "main"
-                return directory
-            except Exception as e:
-                QMessageBox.critical(parent_widget, "Error", f"Error creating repository: {e}")
-        return None
-
-    def cloneRepository(self, parent_widget):
-        from PyQt5.QtWidgets import QFileDialog, QInputDialog
-        url, ok = QInputDialog.getText(parent_widget, "Clone Repository", "Enter repository URL:")
-        if ok and url:
-            directory = QFileDialog.getExistingDirectory(parent_widget, "Select Directory for Cloned Repository")
-            if directory:
-                try:
-                    self.repo = Repo.clone_from(url, directory)
-                    self.current_branch = self.repo.active_branch.name
-                    return directory
-                except Exception as e:
-                    QMessageBox.critical(parent_widget, "Error", f"Error cloning repository: {e}")
-        return None
-
-    def loadExistingRepository(self, parent_widget):
-        from PyQt5.QtWidgets import QFileDialog
-        directory = QFileDialog.getExistingDirectory(parent_widget, "Select Existing Repository")
-        if directory:
-            if not os.path.exists(os.path.join(directory, ".git")):
-                QMessageBox.critical(parent_widget, "Error", "The selected directory is not a valid Git repository.")
-                return None
-            try:
-                self.repo = Repo(directory)
-                self.current_branch = self.repo.active_branch.name
-                return directory
-            except Exception as e:
-                QMessageBox.critical(parent_widget, "Error", f"Error loading repository: {e}")
-        return None
+    @property
+    def repo(self):
+        """
+        The current repository, as a Repo of the calling thread's own.
+        GitPython talks to long-running cat-file processes per Repo that
+        hang when several threads use them at once, so the GUI thread and
+        every worker thread get separate instances.
+        """
+        if self.directory is None:
+            return None
+        if getattr(self.local, "directory", None) != self.directory:
+            self.local.repo = Repo(self.directory)
+            self.local.directory = self.directory
+        return self.local.repo
 
-    def getAllFiles(self):
-        """Return a list of all files (relative paths) in the working tree, excluding ignored folders."""
-        file_list = []
-        if self.repo and self.repo.working_tree_dir:
-            root_dir = self.repo.working_tree_dir
-            for root, dirs, files in os.walk(root_dir):
-                # Remove ignored directories
-                dirs[:] = [d for d in dirs if d not in IGNORED_FOLDERS]
-                for f in files:
-                    rel_path = os.path.relpath(os.path.join(root, f), root_dir)
-                    file_list.append(rel_path)
-        return file_list
+    @repo.setter
+    def repo(self, repo):
+        self.directory = None if repo is None else (repo.working_tree_dir or repo.git_dir)
+        self.local.repo = repo
+        self.local.directory = self.directory
 
-    def stageFile(self, file):
+    @timed
+    def initRepository(self, directory):
+        """Create a new repository in directory and make it the current one."""
+        self.repo = Repo.init(directory)
+        self.current_branch = "main"
+        return directory
+
+    @timed
+    def cloneInto(self, url, directory, depth=None, filter_spec=None, progress=None, cancel=None):
+        """Clone url into directory (optionally shallow or partial) and make it the current repo."""
+        remoteops.clone(url, directory, depth, filter_spec, progress, cancel)
+        self.repo = Repo(directory)
+        self.current_branch = self.branchName()
+        return directory
+
+    @timed
+    def openRepository(self, directory):
+        """Make the repository in directory the current one; raises if it is not one."""
+        if not os.path.exists(os.path.join(directory, ".git")):
+            raise ValueError(f"{directory} is not a Git repository.")
+        self.repo = Repo(directory)
+        self.current_branch = self.branchName()
+        return directory
+
+    def branchName(self):
+        """Name of the checked out branch, or None on a detached HEAD (as in CI checkouts)."""
+        if self.repo.head.is_detached:
+            return None
+        return self.repo.active_branch.name
+
+    @timed(items=len)
+    def commitGraph(self, preview=None, page_size=0):
+        """
+        Return the on-disk commit cache of the current repository, extended
+        with any commits the ref tips gained since the last call. Loading
+        the cache takes longer the deeper the history is: when it has to be
+        loaded first, preview (if given) is called with a HistoryPage of the
+        newest page_size commits before that.
+        """
         if not self.repo:
+            return None
+        if self.commit_cache is None or self.commit_cache.repo.git_dir != self.repo.git_dir:
+            if preview is not None:
+                preview(HistoryPage(self.repo, page_size))
+            if self.commit_cache is not None:
+                self.commit_cache.close()
+            # The cache gets a Repo of its own; it is only updated from the tab's worker
+            self.commit_cache = CommitCache(Repo(self.directory))
+        self.commit_cache.update()
+        return self.commit_cache
+
+    def iterHistory(self, *revs, max_count=None):
+        """
+        Yield lightweight CommitRecords (sha, parents, author, time, summary)
+        for revs, newest first, parsed lazily from one `git log` stream.
+        Defaults to the history of HEAD.
+        """
+        if not self.repo or not self.repo.head.is_valid():
+            return
+        yield from readHistory(self.repo, *(revs or ("HEAD",)), max_count=max_count)
+
+    @timed(items=lambda status: len(status.working))
+    def getStatus(self):
+        """
+        Return a RepoStatus with every file state of the working tree, or None
+        without a repository. One porcelain status replaces the separate index
+        diffs and untracked scans.
+        """
+        if not self.repo or not self.repo.working_tree_dir:
+            return None
+        git = self.repo.git
+        # No optional index refresh: a status must not write .git/index,
+        # or the repository watcher would see its own refresh as a change
+        porcelain = git.status("--porcelain=v2", "-z", "--untracked-files=all",
+                               env={"GIT_OPTIONAL_LOCKS": "0"})
+        tracked = git.ls_files("-z")
+        committed = ""
+        if self.repo.head.is_valid():
+            committed = git.diff_tree(*COMMITTED_ARGS, "--name-only", "-z", "HEAD")
+        return parseStatus(porcelain, tracked, committed, IGNORED_FOLDERS)
+
+    def diffKey(self, path, mode):
+        """
+        Return (path, old blob sha, new blob sha) of the diff shown for path
+        in mode (WORKING, STAGED or COMMITTED). Working tree content is hashed
+        the way git hashes blobs.
+        """
+        git = self.repo.git
+        if mode == COMMITTED:
+            raw = git.diff_tree(*COMMITTED_ARGS, "--raw", "HEAD", "--", path)
+        elif mode == STAGED:
+            base = "HEAD" if self.repo.head.is_valid() else EMPTY_TREE
+            raw = git.diff_index("--cached", "--raw", base, "--", path)
+        else:
+            raw = git.diff_files("--raw", "--", path)
+            if not raw:
+                # Unmodified or untracked
+                entry = git.ls_files("-s", "--", path)
+                if entry:
+                    sha = entry.split()[1]
+                    return (path, sha, sha)
+                return (path, NULL_SHA, blobSha(os.path.join(self.repo.working_tree_dir, path)))
+        if not raw:
+            return (path, NULL_SHA, NULL_SHA)
+        # ":100644 100644 <old> <new> M<TAB>path"
+        fields = raw.splitlines()[0].split("\t")[0].split()
+        old, new = fields[2], fields[3]
+        if mode == WORKING and new == NULL_SHA:
+            new = blobSha(os.path.join(self.repo.working_tree_dir, path)) or NULL_SHA
+        return (path, old, new)
+
+    @timed(items=lambda result: len(result[1] or ()))
+    def readDiff(self, path, mode, shown=None, publish=None, cancel=None):
+        """
+        Return (key, hunks) of the diff of path in mode, streaming batches of
+        parsed hunks to publish(hunks) while git is still writing the diff.
+        Diffs are cached by diffKey(); a diff whose key equals shown is not
+        read or published again. hunks is None when cancelled.
+        """
+        key = self.diffKey(path, mode)
+        if key == shown:
+            return key, []
+        hunks = self.diff_cache.get(key)
+        if hunks is not None:
+            if publish:
+                publish(hunks)
+            return key, hunks
+
+        git = self.repo.git
+        ok_status = (0,)
+        if mode == COMMITTED:
+            proc = git.diff_tree(*COMMITTED_ARGS, "-p", "--no-color", "HEAD", "--", path, as_process=True)
+        elif mode == STAGED:
+            proc = git.diff("--cached", "--no-color", "--", path, as_process=True)
+        elif key[1] == NULL_SHA:
+            # Untracked: the whole file is new; --no-index exits 1 when there is a difference
+            proc = git.diff("--no-index", "--no-color", "--", os.devnull, path, as_process=True)
+            ok_status = (0, 1)
+        else:
+            proc = git.diff("--no-color", "--", path, as_process=True)
+
+        hunks = []
+        batch = []
+        batch_lines = 0
+        for hunk in streamDiff(proc, cancel, ok_status):
+            hunks.append(hunk)
+            batch.append(hunk)
+            batch_lines += len(hunk)
+            if publish and batch_lines >= 500:
+                publish(batch)
+                batch = []
+                batch_lines = 0
+        if cancel is not None and cancel.is_set():
+            return key, None
+        if publish and batch:
+            publish(batch)
+        self.diff_cache.put(key, hunks)
+        return key, hunks
+
+    @timed(items=lambda result: len(result[1] or ()))
+    def readBlame(self, path, working=False, publish=None, cancel=None):
+        """
+        Blame path at HEAD, or in the working tree with working. Returns
+        (key, lines, groups, commits): the file's lines, (sha, first line,
+        count) groups and sha -> BlameCommit. While git works, publish gets
+        ("lines", lines) first and then ("blame", groups, commits) batches.
+        Results are cached by (path, revision); the working tree's revision
+        is HEAD and the blob sha of its content, as committing changes the
+        blame of unchanged content. lines is None when cancelled.
+        """
+        git = self.repo.git
+        full_path = os.path.join(self.repo.working_tree_dir, path)
+        if working:
+            head = self.repo.head.commit.hexsha if self.repo.head.is_valid() else None
+            revision = (head, blobSha(full_path))
+            with open(full_path, "rb") as f:
+                data = f.read()
+        else:
+            revision = git.rev_parse("--verify", "HEAD")
+            data = git.cat_file("-p", f"{revision}:{path}", stdout_as_string=False)
+        key = (path, revision)
+        cached = self.blame_cache.get(key)
+        if cached is not None:
+            lines, groups, commits = cached
+            if publish:
+                publish(("lines", lines))
+                publish(("blame", groups, commits))
+            return (key,) + cached
+
+        # Lines as git counts them: splitlines() would also break on \f, \v,
+        # \x1c-\x1e, \x85 and \u2028 and shift every later line
+        lines = data.decode("utf-8", errors="replace").split("\n")
+        if lines[-1] == "":
+            lines.pop()
+        lines = [line[:-1] if line.endswith("\r") else line for line in lines]
+        if publish:
+            # The text shows right away; authorship fills in as blame streams
+            publish(("lines", lines))
+        args = ["--incremental"] + ([] if working else [revision]) + ["--", path]
+        proc = git.blame(*args, as_process=True)
+        commits = {}
+        groups = []
+        batch = []
+        for group in streamBlame(proc, commits, cancel):
+            groups.append(group)
+            batch.append(group)
+            if publish and len(batch) >= 200:
+                publish(("blame", batch, {sha: commits[sha] for sha, _, _ in batch}))
+                batch = []
+        if cancel is not None and cancel.is_set():
+            return key, None, None, None
+        if publish and batch:
+            publish(("blame", batch, {sha: commits[sha] for sha, _, _ in batch}))
+        self.blame_cache.put(key, (lines, groups, commits))
+        return key, lines, groups, commits
+
+    @timed(items=len)
+    def getAllFiles(self):
+        """Return a list of all files (relative paths) in the working tree, excluding ignored ones."""
+        return list(self.iterAllFiles())
+
+    def iterAllFiles(self):
+        """
+        Yield the tracked and untracked working tree files as git lists
+        them, so every ignore rule git knows applies (.gitignore files,
+        .git/info/exclude and core.excludesFile), minus IGNORED_FOLDERS.
+        """
+        if not self.repo or not self.repo.working_tree_dir:
+            return
+        output = self.repo.git.ls_files("-z", "-c", "-o", "--exclude-standard", "--deduplicate",
+                                        stdout_as_string=False)
+        for path in os.fsdecode(output).split("\0"):
+            if path and not IGNORED_FOLDERS.intersection(path.split("/")[:-1]):
+                yield path
+
+    def pathspecFile(self, files):
+        """Write paths NUL separated to a temp file for git's --pathspec-from-file."""
+        handle, path = tempfile.mkstemp(prefix="gitdag-pathspec-")
+        with os.fdopen(handle, "wb") as f:
+            f.write(b"\0".join(os.fsencode(p) for p in files))
+        return path
+
+    def runWithPathspec(self, files, *args):
+        """
+        Run one git command over any number of paths: one process, one index
+        write. Paths are literal, so a file named '*.py' is only that file.
+        """
+        spec = self.pathspecFile(files)
+        try:
+            self.repo.git.execute(["git", "--literal-pathspecs"] + list(args)
+                                  + [f"--pathspec-from-file={spec}", "--pathspec-file-nul"])
+        finally:
+            os.remove(spec)
+
+    @timed
+    def stageFiles(self, files):
+        """Stage files or whole directories, including deletions."""
+        if not self.repo or not files:
             return
         try:
-            self.repo.index.add([file])
-            self.repo.index.write()
+            self.runWithPathspec(files, "add", "-A")
         except Exception as e:
-            print("Error staging file:", e)
+            print("Error staging files:", e)
 
-    def unstageFile(self, file):
+    @timed
+    def stageAll(self):
         if not self.repo:
             return
         try:
-            self.repo.git.reset('HEAD', '--', file)
+            self.repo.git.add("-A")
+        except Exception as e:
+            print("Error staging files:", e)
+
+    @timed
+    def unstageFiles(self, files):
+        if not self.repo or not files:
+            return
+        try:
+            if self.repo.head.is_valid():
+                self.runWithPathspec(files, "reset", "-q", "HEAD")
+            else:
+                # Nothing to reset to before the first commit: drop the index entries
+                self.runWithPathspec(files, "rm", "--cached", "-r", "-q")
         except Exception as e:
-            print("Error unstaging file:", e)
+            print("Error unstaging files:", e)
+
+    def stageFile(self, file):
+        self.stageFiles([file])
 
+    def unstageFile(self, file):
+        self.unstageFiles([file])
+
+    @timed
     def commit(self, message):
         if self.repo:
             try:
@@ -89,21 +363,22 @@ class GitIntegration:
             except Exception as e:
                 print("Commit error:", e)
 
+    @timed(items=len)
     def listBranches(self):
         if not self.repo:
             return []
         return [str(b) for b in self.repo.branches]
 
+    @timed
     def createBranch(self, branch_name, commit_sha=None):
+        """Create a branch at commit_sha, or HEAD. Errors are raised to the caller."""
         if self.repo:
-            try:
-                if commit_sha:
-                    self.repo.git.branch(branch_name, commit_sha)
-                else:
-                    self.repo.git.branch(branch_name)
-            except Exception as e:
-                print("Error creating branch:", e)
+            if commit_sha:
+                self.repo.git.branch(branch_name, commit_sha)
+            else:
+                self.repo.git.branch(branch_name)
 
+    @timed
     def checkoutBranch(self, branch_name):
         if self.repo:
             try:
@@ -112,13 +387,97 @@ class GitIntegration:
             except Exception as e:
                 print("Error checking out branch:", e)
 
-    def pushCurrentBranch(self):
+    @timed
+    def pushCurrentBranch(self, progress=None, cancel=None):
+        """Push the current branch to origin. Errors are raised to the caller."""
+        if not self.repo:
+            return
+        branch_name = self.current_branch = self.branchName()
+        if branch_name is None:
+            # A detached HEAD has no branch to push to (the refspec would be None:None)
+            raise ValueError("HEAD is detached; check out a branch to push it.")
+        remoteops.push(self.repo.working_tree_dir, "origin", f"{branch_name}:{branch_name}", progress, cancel)
+        print(f"Pushed {branch_name} to origin.")
+
+    @timed
+    def fetch(self, progress=None, cancel=None):
         if not self.repo:
             return
+        remoteops.fetch(self.repo.working_tree_dir, "origin", progress, cancel)
+
+    @timed(items=lambda result: len(result[1]))
+    def rebaseCandidates(self, base):
+        """
+        Return (base sha, commits): the commits an interactive rebase onto
+        base would replay, as (sha, summary, author) oldest first. git works
+        out base..HEAD itself, as commit dates cannot be trusted to tell
+        which commits the base already has. Merges are left out, as
+        `git rebase` drops them.
+        """
+        base_sha = self.repo.git.rev_parse("--verify", f"{base}^{{commit}}")
+        if not self.repo.head.is_valid():
+            raise ValueError("There is no commit to rebase.")
+        records = readHistory(self.repo, f"{base_sha}..HEAD", extra_args=("--reverse", "--no-merges"))
+        return base_sha, [(r.sha, r.summary, r.author) for r in records]
+
+    @timed
+    def rebaseWithPlan(self, base, plan):
+        """
+        Rebase the current branch onto base following plan, a list of
+        (action, sha) with action one of REBASE_ACTIONS, oldest first.
+        git runs its interactive rebase without any editor: the todo list is
+        replaced by the plan and squash messages are kept as git combines
+        them. Errors (conflicts included, which leave the rebase stopped)
+        are raised to the caller.
+        """
+        error = rebasePlanError(plan)
+        if error:
+            raise ValueError(error)
+        with tempfile.NamedTemporaryFile("w", suffix=".todo", delete=False, encoding="utf-8") as f:
+            for action, sha in plan:
+                f.write(f"{action} {sha}\n")
+            todo = f.name
         try:
-            branch_name = self.current_branch
-            origin = self.repo.remote(name='origin')
-            origin.push(refspec=f"{branch_name}:{branch_name}")
-            print(f"Pushed {branch_name} to origin.")
-        except Exception as e:
-            print("Push error:", e)
+            copy = "import shutil, sys; shutil.copyfile(sys.argv[1], sys.argv[2])"
+            env = {
+                # git runs the sequence editor through the shell with the todo path appended
+                "GIT_SEQUENCE_EDITOR": f'"{sys.executable}" -c "{copy}" "{todo}"',
+                "GIT_EDITOR": "true",
+            }
+            self.repo.git.rebase("-i", base, env=env)
+        finally:
+            os.remove(todo)
+
+    def rebaseInProgress(self):
+        git_dir = self.repo.git_dir
+        return any(os.path.isdir(os.path.join(git_dir, d)) for d in ("rebase-merge", "rebase-apply"))
+
+    @timed
+    def rebaseAbort(self):
+        self.repo.git.rebase("--abort")
+
+    @timed(items=len)
+    def listStashes(self):
+        """Return the stash entries as (ref, sha, time, message), newest first."""
+        if not self.repo or not self.repo.head.is_valid():
+            return []
+        fields = self.repo.git.stash("list", "-z", "--format=%gd%x00%H%x00%ct%x00%gs").split("\0")
+        return [(fields[i], fields[i + 1], int(fields[i + 2] or 0), fields[i + 3])
+                for i in range(0, len(fields) - 3, 4)]
+
+    @timed
+    def stashSave(self, message="", include_untracked=False):
+        args = ["push"]
+        if include_untracked:
+            args.append("--include-untracked")
+        if message:
+            args += ["-m", message]
+        self.repo.git.stash(*args)
+
+    @timed
+    def stashApply(self, ref, pop=False):
+        self.repo.git.stash("pop" if pop else "apply", ref)
+
+    @timed
+    def stashDrop(self, ref):
+        self.repo.git.stash("drop", ref)
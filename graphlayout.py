@@ -0,0 +1,141 @@
+# graphlayout.py
+"""
+Lane layout for commit graphs, in the style of `git log --graph`.
+
+Pure Python and independent of Qt: the input is a list of shas in
+topological order (children before parents, newest first) and a map of
+sha -> parent shas; the output is a (lane, row) position per commit.
+Each commit is visited once and lanes are recycled through a heap, so a
+history of n commits lays out in O(n log lanes). Positions are kept as a
+row per sha and a compact array of lanes per row.
+"""
+import heapq
+from array import array
+
+
+class GraphLayout:
+    """
+    Incremental lane assignment. Commits are fed newest first with add();
+    a commit continues the lane that was reserved by its first child, its
+    first parent inherits that lane and further (merge) parents open new
+    lanes. Lanes that end are reused from the left.
+    """
+    def __init__(self):
+        self.lanes = []      # lane index -> sha expected next in that lane, or None if free
+        self.lane_of = {}    # expected sha -> lane index reserved for it
+        self.free = []       # heap of free lane indexes
+        self.row_of = {}     # sha -> row
+        self.row_lanes = array("i")  # row -> lane of the commit on it
+        self.moved = {}      # sha -> [(row, lane), ...] for reservations that changed lane
+        self.rows = 0
+
+    def takeLane(self):
+        while self.free:
+            lane = heapq.heappop(self.free)
+            if self.lanes[lane] is None:
+                return lane
+        self.lanes.append(None)
+        return len(self.lanes) - 1
+
+    def releaseLane(self, lane):
+        self.lanes[lane] = None
+        heapq.heappush(self.free, lane)
+
+    def reserve(self, lane, sha):
+        self.lanes[lane] = sha
+        self.lane_of[sha] = lane
+
+    def add(self, sha, parents):
+        """Places one commit on the next row and returns its (lane, row)."""
+        lane = self.lane_of.pop(sha, None)
+        if lane is None:
+            # A branch tip (or a commit whose children were not laid out)
+            lane = self.takeLane()
+        self.lanes[lane] = sha
+        position = (lane, self.rows)
+        self.row_of[sha] = self.rows
+        self.row_lanes.append(lane)
+        self.rows += 1
+
+        if not parents:
+            self.releaseLane(lane)
+            return position
+
+        first = parents[0]
+        other = self.lane_of.get(first)
+        if (other is not None and other < lane) or first in self.row_of:
+            # Another child already leads to the first parent: merge into its lane
+            self.releaseLane(lane)
+        else:
+            if other is not None:
+                # Keep the first parent in the leftmost lane leading to it;
+                # edges already heading down the other lane bend over here
+                self.releaseLane(other)
+                self.moved.setdefault(first, [(-1, other)]).append((position[1], lane))
+            self.reserve(lane, first)
+        for parent in parents[1:]:
+            if parent not in self.lane_of and parent not in self.row_of:
+                self.reserve(self.takeLane(), parent)
+        return position
+
+    def position(self, sha):
+        """The (lane, row) of a placed commit, or None."""
+        row = self.row_of.get(sha)
+        return None if row is None else (self.row_lanes[row], row)
+
+    def laneToward(self, parent, row):
+        """The lane an edge toward parent runs in just below row, or None if unknown."""
+        moves = self.moved.get(parent)
+        if moves is not None:
+            lane = None
+            for start, lane_after in moves:
+                if start > row:
+                    break
+                lane = lane_after
+            return lane
+        parent_row = self.row_of.get(parent)
+        if parent_row is not None:
+            return self.row_lanes[parent_row]
+        return self.lane_of.get(parent)
+
+    def route(self, sha, parent):
+        """
+        The (lane, row) points of the edge from a placed commit to parent, as
+        `git log --graph` draws it: a bend into the lane reserved for the
+        parent, down that lane, and over to the next lane wherever the
+        reservation moved. Ends at the parent once it is placed, otherwise
+        one row below the commit.
+        """
+        row = self.row_of[sha]
+        points = [(self.row_lanes[row], row)]
+        parent_row = self.row_of.get(parent)
+        if parent_row is not None and parent_row <= row + 1:
+            # The next row, or not below the commit at all: nothing to route around
+            return points + [(self.row_lanes[parent_row], parent_row)]
+        lane = self.laneToward(parent, row)
+        if lane is None:
+            lane = points[0][0]
+        points.append((lane, row + 1))
+        if parent_row is None:
+            return points
+        for start, lane_after in self.moved.get(parent, ()):
+            if row < start < parent_row and lane_after != lane:
+                points.append((lane, start))
+                points.append((lane_after, start + 1))
+                lane = lane_after
+        end = (self.row_lanes[parent_row], parent_row)
+        if end != points[-1]:
+            points.append(end)
+        return points
+
+    def extend(self, order, parents):
+        """Lays out further commits, continuing after the ones already placed."""
+        for sha in order:
+            self.add(sha, parents.get(sha, ()))
+
+
+def layoutGraph(order, parents):
+    """Returns {sha: (lane, row)} for shas in topological order, newest first."""
+    layout = GraphLayout()
+    layout.extend(order, parents)
+    return {sha: (layout.row_lanes[row], row) for sha, row in layout.row_of.items()}
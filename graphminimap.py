@@ -0,0 +1,134 @@
+# graphminimap.py
+from array import array
+from PyQt5.QtWidgets import QWidget
+from PyQt5.QtCore import Qt, pyqtSignal
+from PyQt5.QtGui import QPainter, QColor, QImage, QPen
+
+
+class GraphMinimap(QWidget):
+    """
+    A narrow overview of the whole history beside the graph. Commits are
+    binned by row and lane from the layout arrays into a small density
+    image, so it costs the same for a thousand or a million commits. The
+    rows in view, HEAD, the focused commit and search hits are drawn on top;
+    clicking or dragging emits rowRequested with the row under the mouse.
+    """
+    rowRequested = pyqtSignal(int)
+
+    BINS = 512     # vertical resolution of the density image
+    COLUMNS = 24   # lanes shown; wider graphs share the last column
+    INK = (50, 50, 50)
+    BACKGROUND = QColor(230, 230, 230)
+    UNLOADED = QColor(200, 200, 200)
+    VIEW_PEN = QPen(QColor(0, 120, 215), 1)
+    MATCH_COLOR = QColor(255, 200, 0)
+    HEAD_COLOR = QColor("green")
+    FOCUS_COLOR = QColor(0, 200, 255)
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.setFixedWidth(60)
+        self.setCursor(Qt.PointingHandCursor)
+        self.total = 0   # rows the whole history will take
+        self.rows = 0    # rows laid out and binned so far
+        self.counts = array("I", bytes(4 * self.BINS * self.COLUMNS))
+        self.image = None
+        self.view = (0, 0)   # first and last row in view
+        self.marks = ()      # rows of search hits
+        self.headRow = -1
+        self.focusRow = -1
+
+    def setRows(self, row_lanes, total, reset=False):
+        """
+        Bins the rows of row_lanes added since the last call, or all of them
+        with reset (after a relayout). total is the number of rows expected
+        once everything is loaded.
+        """
+        total = max(total, len(row_lanes))
+        start = self.rows
+        if reset or total != self.total or len(row_lanes) < self.rows:
+            # The rows or the scale changed: rebin everything
+            self.total = total
+            self.counts = array("I", bytes(4 * self.BINS * self.COLUMNS))
+            start = 0
+        counts = self.counts
+        bins, columns, last = self.BINS, self.COLUMNS, self.COLUMNS - 1
+        for row in range(start, len(row_lanes)):
+            lane = row_lanes[row]
+            counts[row * bins // total * columns + (lane if lane < last else last)] += 1
+        self.rows = len(row_lanes)
+        self.image = None
+        self.update()
+
+    def setView(self, first, last):
+        if (first, last) != self.view:
+            self.view = (first, last)
+            self.update()
+
+    def setMarks(self, marks, head_row=-1, focus_row=-1):
+        self.marks = marks
+        self.headRow = head_row
+        self.focusRow = focus_row
+        self.update()
+
+    def clear(self):
+        self.total = 0
+        self.rows = 0
+        self.image = None
+        self.view = (0, 0)
+        self.setMarks(())
+
+    def densityImage(self):
+        # A bin is fully inked when every row it covers sits in that column
+        capacity = max(1, -(-self.total // self.BINS))
+        r, g, b = self.INK
+        data = bytearray(4 * len(self.counts))
+        for i, count in enumerate(self.counts):
+            if count:
+                alpha = 255 if count >= capacity else 60 + 195 * count // capacity
+                data[4 * i:4 * i + 4] = bytes((b, g, r, alpha))
+        image = QImage(bytes(data), self.COLUMNS, self.BINS, 4 * self.COLUMNS, QImage.Format_ARGB32)
+        return image.copy()  # detach from the temporary buffer
+
+    def rowY(self, row):
+        return int(row * self.height() / self.total)
+
+    def paintEvent(self, event):
+        painter = QPainter(self)
+        painter.fillRect(self.rect(), self.BACKGROUND)
+        if self.total == 0:
+            return
+        width = self.width()
+        loaded = self.rowY(self.rows)
+        if loaded < self.height():
+            painter.fillRect(0, loaded, width, self.height() - loaded, self.UNLOADED)
+        if self.image is None:
+            self.image = self.densityImage()
+        painter.drawImage(self.rect(), self.image)
+
+        # One tick per pixel row, however many hits share it
+        for y in {self.rowY(row) for row in self.marks}:
+            painter.fillRect(width - 10, y, 10, 2, self.MATCH_COLOR)
+        if self.headRow >= 0:
+            painter.fillRect(0, self.rowY(self.headRow), 10, 3, self.HEAD_COLOR)
+        if self.focusRow >= 0:
+            painter.fillRect(0, self.rowY(self.focusRow), width, 3, self.FOCUS_COLOR)
+
+        first, last = self.view
+        top = self.rowY(first)
+        painter.setPen(self.VIEW_PEN)
+        painter.setBrush(QColor(0, 120, 215, 40))
+        painter.drawRect(0, top, width - 1, max(3, self.rowY(last) - top))
+
+    def requestRowAt(self, y):
+        if self.total:
+            row = int(y * self.total / max(1, self.height()))
+            self.rowRequested.emit(min(max(row, 0), self.total - 1))
+
+    def mousePressEvent(self, event):
+        if event.button() == Qt.LeftButton:
+            self.requestRowAt(event.pos().y())
+
+    def mouseMoveEvent(self, event):
+        if event.buttons() & Qt.LeftButton:
+            self.requestRowAt(event.pos().y())
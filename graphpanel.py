@@ -1,48 +1,157 @@
 # graphpanel.py
 
 from PyQt5.QtWidgets import (
-    QWidget, QGraphicsView, QGraphicsScene, QGraphicsObject,
-    QInputDialog, QMessageBox
+    QWidget, QGraphicsView, QGraphicsScene, QGraphicsObject, QGraphicsItem, QLineEdit
 )
-from PyQt5.QtCore import Qt, QRectF, QTimer, QLineF
-from PyQt5.QtGui import QPen, QColor, QFont, QPainter
-import math
+from PyQt5.QtCore import Qt, QRectF, QLineF, QPointF, QTimer
+from PyQt5.QtGui import QPen, QBrush, QColor, QFont, QPainter, QPixmap
+import itertools
+from array import array
+from workers import CoalescedRefresh
+from graphlayout import GraphLayout
+from graphminimap import GraphMinimap
+from commitsearch import CommitSearchIndex
+from perf import timed, addItems
+
+# Distance between lanes (columns) and commit rows in scene coordinates
+LANE_SPACING = 170
+ROW_SPACING = 80
+# Commits loaded at once; older pages follow when scrolling to the bottom
+PAGE_SIZE = 500
+# Rows whose edges are drawn by one EdgeBandItem
+EDGE_BAND_ROWS = 256
+# Where edges attach to a node, relative to its position
+NODE_CENTER = QPointF(70, 30)
+# Rows above and below the viewport that keep a node item, and the most
+# node items alive at once (zoomed far out, the rows around the center)
+NODE_MARGIN_ROWS = 20
+MAX_NODE_ITEMS = 1000
+# Refs whose history is drawn, besides HEAD; notes, stash, prefetch and
+# other bookkeeping refs are left out
+GRAPH_REFS = ("refs/heads/", "refs/remotes/", "refs/tags/")
+
+def refDecorations(tips):
+    """Maps sha -> display names of the refs pointing at it (HEAD and branches first)."""
+    decorations = {}
+    for ref in sorted(tips, key=lambda r: (r != "HEAD", r.startswith("refs/tags/"), r)):
+        if ref == "HEAD":
+            name = "HEAD"
+        elif ref.startswith("refs/heads/"):
+            name = ref[len("refs/heads/"):]
+        elif ref.startswith("refs/remotes/"):
+            name = ref[len("refs/remotes/"):]
+            if name.endswith("/HEAD"):
+                continue
+        elif ref.startswith("refs/tags/"):
+            name = "tag: " + ref[len("refs/tags/"):]
+        else:
+            continue
+        decorations.setdefault(tips[ref], []).append(name)
+    return decorations
 
 class CommitNodeItem(QGraphicsObject):
-    """A clickable commit node with a plus-button for branch creation."""
-    def __init__(self, commit_sha, commit_msg, is_head=False, parent=None):
+    """
+    A clickable commit node with a plus-button for branch creation.
+
+    Pens, brushes and the font are shared by all nodes and the label is
+    built once. Below LOD_THRESHOLD (zoomed far out) a node is drawn as a
+    plain dot without text. Items are recycled for other commits with
+    setCommit() as the view scrolls.
+    """
+    LOD_THRESHOLD = 0.4
+    HEAD_BRUSH = QBrush(QColor("green"))
+    NODE_BRUSH = QBrush(QColor("gray"))
+    PLUS_BRUSH = QBrush(QColor("darkblue"))
+    OUTLINE_PEN = QPen(Qt.black, 1)
+    MATCH_PEN = QPen(QColor(255, 200, 0), 4)
+    FOCUS_PEN = QPen(QColor(0, 200, 255), 4)
+    TEXT_PEN = QPen(Qt.white)
+    REF_PEN = QPen(QColor(255, 220, 120))
+    FONT = None
+
+    def __init__(self, commit_sha, commit_msg, is_head=False, refs=(), parent=None):
         super().__init__(parent)
-        self.commit_sha = commit_sha
-        self.commit_msg = commit_msg
-        self.is_head = is_head
+        if CommitNodeItem.FONT is None:
+            CommitNodeItem.FONT = QFont("Arial", 8)
         self.rect = QRectF(0, 0, 140, 60)
         # 'Plus' button in the top-right corner
         self.plusRect = QRectF(self.rect.right() - 20, self.rect.top(), 20, 20)
+        self.dotRect = QRectF(self.rect.center().x() - 12, self.rect.center().y() - 12, 24, 24)
+        self.match = None  # None without an active search, else True/False
+        self.focused = False  # the commit jumped to from another panel
+        self.setCommit(commit_sha, commit_msg, is_head, refs)
         self.setAcceptHoverEvents(True)
+        # Repaints while panning are blits of the cached rendering
+        self.setCacheMode(QGraphicsItem.DeviceCoordinateCache)
 
     def boundingRect(self):
         return self.rect.adjusted(-2, -2, 2, 2)
 
     def paint(self, painter, option, widget):
         # Node background: green if HEAD, gray otherwise
-        color = QColor("green") if self.is_head else QColor("gray")
-        painter.setBrush(color)
-        painter.setPen(QPen(Qt.black, 1))
+        brush = self.HEAD_BRUSH if self.is_head else self.NODE_BRUSH
+        if option.levelOfDetailFromTransform(painter.worldTransform()) < self.LOD_THRESHOLD:
+            painter.setPen(self.outlinePen(Qt.NoPen))
+            painter.setBrush(brush)
+            painter.drawEllipse(self.dotRect)
+            return
+
+        painter.setBrush(brush)
+        painter.setPen(self.outlinePen(self.OUTLINE_PEN))
         painter.drawRoundedRect(self.rect, 8, 8)
 
-        # Commit text: short SHA + snippet of commit message
-        painter.setPen(Qt.white)
-        painter.setFont(QFont("Arial", 8))
-        short_msg = self.commit_msg.splitlines()[0]
-        text = f"{self.commit_sha[:7]}\n{short_msg[:20]}..."
-        painter.drawText(self.rect.adjusted(5, 5, -5, -5), Qt.AlignLeft | Qt.AlignTop, text)
+        painter.setPen(self.TEXT_PEN)
+        painter.setFont(self.FONT)
+        painter.drawText(self.rect.adjusted(5, 5, -5, -5), Qt.AlignLeft | Qt.AlignTop, self.label)
+        if self.refsLabel:
+            # Branch and tag names pointing at this commit
+            painter.setPen(self.REF_PEN)
+            text = painter.fontMetrics().elidedText(self.refsLabel, Qt.ElideRight, int(self.rect.width()) - 10)
+            painter.drawText(self.rect.adjusted(5, 5, -5, -4), Qt.AlignLeft | Qt.AlignBottom, text)
 
         # Draw the '+' button as a small circle
-        painter.setBrush(QColor("darkblue"))
+        painter.setBrush(self.PLUS_BRUSH)
         painter.drawEllipse(self.plusRect)
-        painter.setPen(Qt.white)
+        painter.setPen(self.TEXT_PEN)
         painter.drawText(self.plusRect, Qt.AlignCenter, "+")
 
+    def setCommit(self, commit_sha, commit_msg, is_head=False, refs=()):
+        """Shows another commit; highlights are left to setMatch and setFocused."""
+        self.commit_sha = commit_sha
+        self.commit_msg = commit_msg
+        self.is_head = is_head
+        # Commit text: short SHA + snippet of commit message
+        short_msg = (commit_msg.splitlines() or [""])[0]
+        self.label = f"{commit_sha[:7]}\n{short_msg[:20]}..."
+        self.refs = tuple(refs)
+        self.refsLabel = ", ".join(self.refs)
+        self.update()
+
+    def outlinePen(self, default):
+        if self.focused:
+            return self.FOCUS_PEN
+        return self.MATCH_PEN if self.match else default
+
+    def setFocused(self, focused):
+        if focused != self.focused:
+            self.focused = focused
+            self.update()
+
+    def setRefs(self, refs):
+        refs = tuple(refs)
+        if refs != self.refs:
+            self.refs = refs
+            self.refsLabel = ", ".join(refs)
+            self.update()
+
+    def setMatch(self, match):
+        """Highlights search hits and dims the other nodes while a search is active."""
+        if match == self.match:
+            return
+        self.match = match
+        self.setOpacity(0.25 if match is False else 1.0)
+        self.update()
+
     def hoverEnterEvent(self, event):
         self.update()
         super().hoverEnterEvent(event)
@@ -59,130 +168,482 @@ class CommitNodeItem(QGraphicsObject):
         else:
             super().mousePressEvent(event)
 
+class EdgeBandItem(QGraphicsItem):
+    """
+    Draws all edges that start in one band of rows. The geometry is kept as
+    flat x1, y1, x2, y2 arrays and only segments that intersect the exposed
+    rect are painted, so a whole band costs one scene item.
+    """
+    PEN = QPen(QColor(50, 50, 50), 2)
+    STUB_PEN = QPen(QColor(50, 50, 50), 2, Qt.DashLine)
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.lines = array("d")
+        self.stubs = array("d")
+        self.bounds = QRectF()
+        self.setFlag(QGraphicsItem.ItemUsesExtendedStyleOption)
+        self.setZValue(-1)
+
+    def setSegments(self, lines, stubs):
+        self.prepareGeometryChange()
+        self.lines = lines
+        self.stubs = stubs
+        coords = lines + stubs
+        if coords:
+            xs = coords[0::4] + coords[2::4]
+            ys = coords[1::4] + coords[3::4]
+            self.bounds = QRectF(min(xs), min(ys), max(xs) - min(xs), max(ys) - min(ys)).adjusted(-2, -2, 2, 2)
+        else:
+            self.bounds = QRectF()
+        self.update()
+
+    def boundingRect(self):
+        return self.bounds
+
+    def paint(self, painter, option, widget):
+        exposed = option.exposedRect
+        left, top, right, bottom = exposed.left(), exposed.top(), exposed.right(), exposed.bottom()
+        for pen, coords in ((self.PEN, self.lines), (self.STUB_PEN, self.stubs)):
+            segments = []
+            for i in range(0, len(coords), 4):
+                x1, y1, x2, y2 = coords[i:i + 4]
+                if (x1 < left and x2 < left) or (x1 > right and x2 > right) \
+                        or (y1 < top and y2 < top) or (y1 > bottom and y2 > bottom):
+                    continue
+                segments.append(QLineF(x1, y1, x2, y2))
+            if segments:
+                painter.setPen(pen)
+                painter.drawLines(segments)
+
 class GraphScene(QGraphicsScene):
     """Scene that draws a grid background and holds commit nodes."""
+    GRID_STEP = 50
+
     def __init__(self, parent=None):
         super().__init__(parent)
-        self.setBackgroundBrush(QColor(230, 230, 230))
+        # The dotted grid is one pre-rendered tile repeated by the background brush
+        self.setBackgroundBrush(QBrush(self.gridTile()))
         self.branchCreationRequestedFn = None
 
-    def drawBackground(self, painter, rect):
-        super().drawBackground(painter, rect)
-        # Draw a dotted grid
-        pen = QPen(QColor(200, 200, 200), 1, Qt.DotLine)
-        painter.setPen(pen)
-        step = 50
-        left = int(rect.left()) - (int(rect.left()) % step)
-        top = int(rect.top()) - (int(rect.top()) % step)
-        for x in range(left, int(rect.right()), step):
-            painter.drawLine(int(x), int(rect.top()), int(x), int(rect.bottom()))
-        for y in range(top, int(rect.bottom()), step):
-            painter.drawLine(int(rect.left()), int(y), int(rect.right()), int(y))
+    @classmethod
+    def gridTile(cls):
+        step = cls.GRID_STEP
+        tile = QPixmap(step, step)
+        tile.fill(QColor(230, 230, 230))
+        painter = QPainter(tile)
+        painter.setPen(QPen(QColor(200, 200, 200), 1, Qt.DotLine))
+        painter.drawLine(0, 0, step - 1, 0)
+        painter.drawLine(0, 0, 0, step - 1)
+        painter.end()
+        return tile
 
 class GraphPanel(QWidget):
     """
     A QGraphicsView-based DAG panel:
-    - Lays commits in a simple grid (3 columns).
-    - Draws edges from each commit to its parent(s).
+    - Lays commits out in lanes like `git log --graph`, newest on top.
+    - Loads history in pages as the view scrolls towards the bottom.
+    - Keeps positions in the layout's arrays; only rows near the viewport
+      have node items, recycled as the view scrolls.
+    - A minimap beside the view shows the whole history for navigation.
+    - Refreshes incrementally: unchanged refs cost nothing, new commits are added.
+    - Draws edges from each commit to its parent(s), batched per band of rows.
     - A plus-button on each commit for creating new branches.
-    - Highlights the HEAD commit in green.
+    - Highlights the HEAD commit in green and labels commits with their refs.
+    - Searches the loaded history and highlights the hits.
     """
-    def __init__(self, git_integration, parent=None):
+    def __init__(self, git_integration, worker, parent=None):
         super().__init__(parent)
         self.git_integration = git_integration
+        self.worker = worker
 
         self.view = QGraphicsView(self)
         self.scene = GraphScene(self)
         self.view.setScene(self.scene)
+        self.view.setCacheMode(QGraphicsView.CacheBackground)
+        self.view.setViewportUpdateMode(QGraphicsView.SmartViewportUpdate)
+        self.view.setOptimizationFlags(QGraphicsView.DontSavePainterState | QGraphicsView.DontAdjustForAntialiasing)
         self.scene.branchCreationRequestedFn = self.onBranchCreationRequested
 
-        from PyQt5.QtWidgets import QVBoxLayout
+        # Search bar over the loaded history
+        self.searchEdit = QLineEdit(self)
+        self.searchEdit.setPlaceholderText('Search commits: sha, words, "phrase", author:name, after:/before:YYYY-MM-DD')
+        self.searchEdit.setClearButtonEnabled(True)
+        self.searchTimer = QTimer(self)
+        self.searchTimer.setSingleShot(True)
+        self.searchTimer.setInterval(150)
+        self.searchTimer.timeout.connect(self.applySearch)
+        self.searchEdit.textChanged.connect(self.searchTimer.start)
+        self.searchEdit.returnPressed.connect(self.showNextMatch)
+
+        # Overview of the whole history; clicking it scrolls there
+        self.minimap = GraphMinimap(self)
+        self.minimap.rowRequested.connect(self.showRow)
+
+        from PyQt5.QtWidgets import QVBoxLayout, QHBoxLayout
         layout = QVBoxLayout(self)
-        layout.addWidget(self.view)
+        layout.addWidget(self.searchEdit)
+        graphRow = QHBoxLayout()
+        graphRow.addWidget(self.view)
+        graphRow.addWidget(self.minimap)
+        layout.addLayout(graphRow)
         self.setLayout(layout)
 
-        # Auto-refresh every 5 seconds (optional)
-        self.timer = QTimer(self)
-        self.timer.timeout.connect(self.refresh)
-        self.timer.start(5000)
+        # Scene state kept between refreshes so only changes are applied
+        self.nodes = {}         # sha -> CommitNodeItem, for rows near the viewport only
+        self.spareNodes = []    # hidden items waiting to be reused
+        self.bands = []         # EdgeBandItem per EDGE_BAND_ROWS loaded rows
+        self.stubBands = set()  # bands with edges to parents not loaded yet
+        self.placeholder = None
+        self.refState = None
 
-        self.refresh()
+        # Paged history: commits are pulled from the walk as the view scrolls
+        self.graph = None
+        self.head_sha = None
+        self.decorations = {}  # sha -> ref names shown on the node
+        self.walker = None
+        self.walkTotal = 0      # commits the walk reaches
+        self.graphLayout = None
+        self.loaded = []        # row -> sha
+        self.view.verticalScrollBar().valueChanged.connect(self.onScrolled)
+        self.view.verticalScrollBar().rangeChanged.connect(lambda _min, _max: self.syncNodes())
 
-    def refresh(self):
-        """Rebuilds the DAG for the current branch in a grid layout, drawing edges to parents."""
+        # Search index over the loaded commits, kept current as pages arrive
+        self.searchIndex = CommitSearchIndex()
+        self.matches = None
+        self.matchOrder = []
+        self.matchCursor = -1
+        self.focusedSha = None  # commit jumped to from another panel
+
+        # Updating the commit cache runs git, so it happens on the worker
+        self.graphLoader = CoalescedRefresh(worker, self.readGraph, self.applyGraph, self.onGraphError,
+                                            self.applyGraph)
+
+    def clearGraph(self):
+        """Removes every item from the scene and forgets the last ref state."""
+        # Forget the items first: resizing the scene syncs the nodes right away
+        self.nodes = {}
+        self.spareNodes = []
+        self.bands = []
+        self.stubBands = set()
+        self.placeholder = None
+        self.refState = None
+        self.graph = None
+        self.walker = None
+        self.walkTotal = 0
+        self.graphLayout = None
+        self.loaded = []
+        self.searchIndex = CommitSearchIndex()
+        self.matches = None
+        self.matchOrder = []
+        self.focusedSha = None
         self.scene.clear()
-        repo = self.git_integration.repo
-        if not repo:
+        self.scene.setSceneRect(QRectF())
+        self.minimap.clear()
+
+    def showPlaceholder(self, text, color):
+        self.clearGraph()
+        self.placeholder = self.scene.addText(text)
+        self.placeholder.setDefaultTextColor(color)
+        self.placeholder.setPos(50, 50)
+
+    def refresh(self):
+        """
+        Syncs the scene with the DAG of all branches, remote-tracking branches and tags.
+
+        The DAG comes from the repository's on-disk commit cache, updated on
+        the worker thread by readGraph(); applyGraph() then patches the scene.
+        No git command runs on the GUI thread. Nothing is
+        rebuilt when the branch, HEAD and all ref tips are unchanged since the
+        last refresh. Otherwise only new commits get nodes and edges,
+        nodes that are no longer reachable are removed and existing nodes are
+        only moved if their layout position changed.
+        """
+        if not self.git_integration.repo:
+            self.clearGraph()
             return
+        self.graphLoader.request()
+
+    def readGraph(self, publish):
+        """
+        Updates the commit cache and, when the refs moved since the scene was
+        last synced, starts the walk over it (worker thread). Returns
+        (graph, ref state, walk), with no walk for unchanged refs or before
+        the first commit. While the cache loads from disk, the first page
+        read straight from git is published the same way.
+        """
+        def preview(page):
+            if "HEAD" in page.tips:
+                # An empty ref state never matches a real one, so the graph
+                # that follows replaces the page
+                publish((page, (), self.startWalk(page)))
+        graph = self.git_integration.commitGraph(preview, PAGE_SIZE)
+        if graph is None:
+            return None
+        ref_state = tuple(sorted(graph.tips.items()))
+        if ref_state == self.refState or "HEAD" not in graph.tips:
+            return graph, ref_state, None
+        return graph, ref_state, self.startWalk(graph)
+
+    def startWalk(self, graph):
+        # One shared walk from every branch, remote-tracking branch and tag:
+        # history they have in common is visited (and drawn) only once.
+        # Setting the walk up visits every reachable commit, so it starts here.
+        tips = {sha for ref, sha in graph.tips.items() if ref == "HEAD" or ref.startswith(GRAPH_REFS)}
+        return graph.walk(sorted(tips))
+
+    def onGraphError(self, error):
+        self.showPlaceholder("Error retrieving commits.", QColor(200, 0, 0))
+
+    @timed
+    def applyGraph(self, result):
+        """Applies an updated commit cache and its walk to the scene (GUI thread)."""
+        if result is None:
+            self.clearGraph()
+            return
+        graph, ref_state, walker = result
+        if ref_state == self.refState:
+            return
+        if "HEAD" not in graph.tips:
+            self.showPlaceholder("No commits yet. Create your first commit!", QColor(150, 150, 150))
+            return
+        if walker is None:
+            # The scene was cleared while the walk was skipped
+            self.graphLoader.request()
+            return
+        head_sha = graph.tips["HEAD"]
+        first = next(walker, None)
+        if first is None:
+            self.showPlaceholder("No commits found.", QColor(150, 150, 150))
+            return
+
+        if self.placeholder is not None:
+            self.clearGraph()
+        self.refState = ref_state
+        self.head_sha = head_sha
+        self.decorations = refDecorations(graph.tips)
 
-        # If no commits exist, show a placeholder
-        if not repo.head.is_valid():
-            textItem = self.scene.addText("No commits yet. Create your first commit!")
-            textItem.setDefaultTextColor(QColor(150, 150, 150))
-            textItem.setPos(50, 50)
+        # Restart the walk, but keep as many commits loaded as before so the
+        # scroll position stays meaningful; existing nodes are reused
+        count = max(PAGE_SIZE, len(self.loaded))
+        self.graph = graph
+        self.walker = itertools.chain([first], walker)
+        self.walkTotal = walker.total
+        self.graphLayout = GraphLayout()
+        self.loaded = []
+        self.loadCommits(count, prune=True)
+
+    def onScrolled(self, value):
+        bar = self.view.verticalScrollBar()
+        if self.walker is not None and value >= bar.maximum() - bar.pageStep():
+            self.loadCommits(PAGE_SIZE)
+        else:
+            self.syncNodes()
+
+    @timed
+    def loadCommits(self, count, prune=False):
+        """
+        Pulls up to count more commits from the walk, lays them out below the
+        loaded ones and adds their edges. With prune, the layout was restarted
+        and every loaded row is redone. Node items follow in syncNodes().
+        """
+        batch = list(itertools.islice(self.walker, count))
+        if len(batch) < count:
+            self.walker = None  # reached the root commit(s)
+        self.graphLayout.extend(batch, self.graph.parents)
+        self.loaded.extend(batch)
+
+        changed = self.loaded if prune else batch
+        addItems(len(changed))
+        # Commits never change, so the index outlives relayouts: only commits
+        # it has not seen are added, and unreachable ones are filtered per query
+        graph = self.graph
+        index = self.searchIndex
+        index.add((sha, graph.summaries[sha], graph.authors[sha], graph.times[sha])
+                  for sha in batch if sha not in index)
+
+        # The scene spans every loaded row, whether or not it has items
+        self.scene.setSceneRect(0, 0, len(self.graphLayout.lanes) * LANE_SPACING, len(self.loaded) * ROW_SPACING)
+        # The minimap is scaled to everything the walk will reach; a relayout
+        # moves lanes around, so it bins every row again
+        self.minimap.setRows(self.graphLayout.row_lanes, self.walkTotal, reset=prune)
+
+        # Edge bands to rebuild: the ones holding the new rows, plus bands
+        # whose stubs may now reach a loaded parent
+        first_row = len(self.loaded) - len(changed)
+        dirty = set(range(first_row // EDGE_BAND_ROWS, (len(self.loaded) - 1) // EDGE_BAND_ROWS + 1))
+        dirty |= self.stubBands
+        for band in sorted(dirty):
+            self.rebuildBand(band)
+        band_count = (len(self.loaded) + EDGE_BAND_ROWS - 1) // EDGE_BAND_ROWS
+        for item in self.bands[band_count:]:
+            self.scene.removeItem(item)
+        del self.bands[band_count:]
+
+        if self.matches is not None:
+            self.applySearch(jump=False)
+        else:
+            self.updateMarks()
+        self.syncNodes()
+
+    def visibleRows(self):
+        """The loaded rows [first, last) that intersect the viewport."""
+        rect = self.view.mapToScene(self.view.viewport().rect()).boundingRect()
+        first = max(0, int(rect.top() // ROW_SPACING))
+        last = min(len(self.loaded), int(rect.bottom() // ROW_SPACING) + 1)
+        return first, max(first, last)
+
+    def syncNodes(self):
+        """
+        Gives the rows in and near the viewport a node item, reusing the
+        items of rows that scrolled away. Every other commit exists only as
+        its row in the layout arrays, so memory does not grow with history.
+        """
+        if self.graphLayout is None:
             return
+        first, last = self.visibleRows()
+        self.minimap.setView(first, last)
+        first = max(0, first - NODE_MARGIN_ROWS)
+        last = min(len(self.loaded), last + NODE_MARGIN_ROWS)
+        if last - first > MAX_NODE_ITEMS:
+            first = (first + last - MAX_NODE_ITEMS) // 2
+            last = first + MAX_NODE_ITEMS
+        wanted = set(self.loaded[first:last])
+        for sha in [s for s in self.nodes if s not in wanted]:
+            nodeItem = self.nodes.pop(sha)
+            nodeItem.hide()
+            self.spareNodes.append(nodeItem)
 
-        branch = self.git_integration.current_branch
-        try:
-            commits = list(repo.iter_commits(branch))
-            commits.reverse()  # oldest first
-        except Exception:
-            textItem = self.scene.addText("Error retrieving commits.")
-            textItem.setDefaultTextColor(QColor(200, 0, 0))
-            textItem.setPos(50, 50)
+        lanes = self.graphLayout.row_lanes
+        summaries = self.graph.summaries
+        for row in range(first, last):
+            sha = self.loaded[row]
+            pos = QPointF(lanes[row] * LANE_SPACING, row * ROW_SPACING)
+            is_head = (sha == self.head_sha)
+            refs = self.decorations.get(sha, ())
+            nodeItem = self.nodes.get(sha)
+            if nodeItem is None:
+                if self.spareNodes:
+                    nodeItem = self.spareNodes.pop()
+                    nodeItem.setCommit(sha, summaries[sha], is_head, refs)
+                    nodeItem.show()
+                else:
+                    nodeItem = CommitNodeItem(sha, summaries[sha], is_head, refs)
+                    self.scene.addItem(nodeItem)
+                self.nodes[sha] = nodeItem
+            else:
+                nodeItem.setRefs(refs)
+                if nodeItem.is_head != is_head:
+                    nodeItem.is_head = is_head
+                    nodeItem.update()
+            if nodeItem.pos() != pos:
+                nodeItem.setPos(pos)
+            # Highlights belong to the commit, not to the recycled item
+            nodeItem.setMatch(None if self.matches is None else sha in self.matches)
+            nodeItem.setFocused(sha == self.focusedSha)
+
+    def updateMarks(self):
+        """Shows the search hits, HEAD and the focused commit on the minimap."""
+        row_of = self.graphLayout.row_of if self.graphLayout is not None else {}
+        self.minimap.setMarks([row_of[sha] for sha in self.matchOrder],
+                              row_of.get(self.head_sha, -1), row_of.get(self.focusedSha, -1))
+
+    def showRow(self, row):
+        """Centers the view on a row, loading history down to it if needed."""
+        if self.graphLayout is None:
             return
+        if row >= len(self.loaded) and self.walker is not None:
+            self.loadCommits(row + PAGE_SIZE - len(self.loaded))
+        if self.loaded:
+            row = min(row, len(self.loaded) - 1)
+            x = self.graphLayout.row_lanes[row] * LANE_SPACING + NODE_CENTER.x()
+            self.view.centerOn(x, row * ROW_SPACING + NODE_CENTER.y())
+            self.syncNodes()
+
+    def applySearch(self, jump=True):
+        """Runs the search box query and highlights the matching nodes."""
+        query = self.searchEdit.text()
+        self.matches = self.searchIndex.search(query) if query.strip() else None
+        if self.matches is not None:
+            row_of = self.graphLayout.row_of if self.graphLayout is not None else {}
+            self.matches = {sha for sha in self.matches if sha in row_of}
+        for sha, nodeItem in self.nodes.items():
+            nodeItem.setMatch(None if self.matches is None else sha in self.matches)
+        self.matchOrder = [sha for sha in self.loaded if sha in self.matches] if self.matches else []
+        self.matchCursor = -1
+        self.updateMarks()
+        if jump:
+            self.showNextMatch()
 
-        if not commits:
-            textItem = self.scene.addText("No commits found on this branch.")
-            textItem.setDefaultTextColor(QColor(150, 150, 150))
-            textItem.setPos(50, 50)
+    def showNextMatch(self):
+        """Centers the view on the next search hit (Enter cycles through them)."""
+        if not self.matchOrder:
             return
+        self.matchCursor = (self.matchCursor + 1) % len(self.matchOrder)
+        self.showRow(self.graphLayout.row_of[self.matchOrder[self.matchCursor]])
 
-        # Lay out commits in a grid: 3 columns
-        cols = 3
-        spacing_x = 200
-        spacing_y = 120
-
-        # We'll store node references in a dict keyed by commit object
-        commit_nodes = {}
-
-        for idx, c in enumerate(commits):
-            row = idx // cols
-            col = idx % cols
-            x = col * spacing_x
-            y = row * spacing_y
-            is_head = (c == repo.head.commit)
-            nodeItem = CommitNodeItem(c.hexsha, c.message, is_head)
-            nodeItem.setPos(x, y)
-            self.scene.addItem(nodeItem)
-            commit_nodes[c] = nodeItem
-
-        # Now draw edges from child -> parent
-        penEdges = QPen(QColor(50, 50, 50), 2)
-        for c in commits:
-            childNode = commit_nodes[c]
-            # Center of the child node
-            childCenter = childNode.pos() + childNode.boundingRect().center()
-            for parent in c.parents:
-                # If parent is in the same branch history, it should appear in commit_nodes
-                if parent in commit_nodes:
-                    parentNode = commit_nodes[parent]
-                    parentCenter = parentNode.pos() + parentNode.boundingRect().center()
-                    line = self.scene.addLine(
-                        childCenter.x(), childCenter.y(),
-                        parentCenter.x(), parentCenter.y(),
-                        penEdges
-                    )
-                    # Optional: you could add an arrow or direction indicator.
+    def showCommit(self, sha):
+        """
+        Highlights a commit and centers the view on it, loading further pages
+        of history until it is reached. Returns False if it is not in the graph.
+        """
+        if self.graph is None or sha not in self.graph.parents:
+            return False
+        while sha not in self.graphLayout.row_of and self.walker is not None:
+            self.loadCommits(PAGE_SIZE)
+        row = self.graphLayout.row_of.get(sha)
+        if row is None:
+            return False
+        self.focusedSha = sha
+        self.updateMarks()
+        self.showRow(row)
+        return True
+
+    def rebuildBand(self, band):
+        """
+        Recomputes the edge geometry of one band of rows from the layout.
+        Edges follow the lane reserved for their parent (see GraphLayout.route)
+        instead of cutting across other lanes. Parents that are not loaded
+        yet get a short dashed stub into their lane that is completed once
+        their page arrives.
+        """
+        layout = self.graphLayout
+        parents = self.graph.parents
+        cx, cy = NODE_CENTER.x(), NODE_CENTER.y()
+        lines = array("d")
+        stubs = array("d")
+        first = band * EDGE_BAND_ROWS
+        for sha in self.loaded[first:first + EDGE_BAND_ROWS]:
+            for parent in parents[sha]:
+                segments = lines if parent in layout.row_of else stubs
+                points = layout.route(sha, parent)
+                for (lane1, row1), (lane2, row2) in zip(points, points[1:]):
+                    segments.extend((lane1 * LANE_SPACING + cx, row1 * ROW_SPACING + cy,
+                                     lane2 * LANE_SPACING + cx, row2 * ROW_SPACING + cy))
+        while len(self.bands) <= band:
+            item = EdgeBandItem()
+            self.scene.addItem(item)
+            self.bands.append(item)
+        self.bands[band].setSegments(lines, stubs)
+        if stubs:
+            self.stubBands.add(band)
+        else:
+            self.stubBands.discard(band)
 
     def onBranchCreationRequested(self, commit_sha):
         """Called when user clicks '+' on a commit node to create a new branch."""
         from PyQt5.QtWidgets import QInputDialog, QMessageBox
         branch_name, ok = QInputDialog.getText(self, "Create Branch", f"Create new branch from {commit_sha[:7]}:")
-        if ok and branch_name:
-            try:
-                self.git_integration.repo.git.branch(branch_name, commit_sha)
-                QMessageBox.information(self, "Branch Created", f"Branch '{branch_name}' created from {commit_sha[:7]}.")
-            except Exception as e:
-                QMessageBox.critical(self, "Error", f"Error creating branch: {e}")
-        self.refresh()
+        if not (ok and branch_name):
+            return
+
+        def onFinished(_result):
+            QMessageBox.information(self, "Branch Created", f"Branch '{branch_name}' created from {commit_sha[:7]}.")
+            self.refresh()
+
+        def onFailed(error):
+            QMessageBox.critical(self, "Error", f"Error creating branch: {error}")
+
+        job = self.worker.submit(self.git_integration.createBranch, branch_name, commit_sha)
+        job.signals.finished.connect(onFinished)
+        job.signals.failed.connect(onFailed)
@@ -0,0 +1,72 @@
+# historyreader.py
+
+# One commit per record: sha, parents, author, committer time, subject line.
+# With -z, fields and records are all NUL separated, so every record is
+# exactly LOG_FIELDS consecutive fields of the stream. Committer time is the
+# one git orders history by; rebased commits keep their older author time.
+LOG_FORMAT = "--format=%H%x00%P%x00%an%x00%ct%x00%s"
+LOG_FIELDS = 5
+CHUNK_SIZE = 1 << 16
+
+
+class CommitRecord:
+    """Lightweight commit as read from `git log`; no object database access."""
+    __slots__ = ("sha", "parents", "author", "time", "summary")
+
+    def __init__(self, sha, parents, author, time, summary):
+        self.sha = sha
+        self.parents = parents
+        self.author = author
+        self.time = time
+        self.summary = summary
+
+    def __repr__(self):
+        return f"<CommitRecord {self.sha[:7]} {self.summary[:30]!r}>"
+
+
+def makeRecord(fields):
+    sha, parents, author, time, summary = (f.decode("utf-8", errors="replace") for f in fields)
+    return CommitRecord(sha.strip(), tuple(parents.split()), author, int(time or 0), summary)
+
+
+def parseLogStream(stream):
+    """Lazily parses a `git log -z LOG_FORMAT` byte stream into CommitRecords."""
+    read = getattr(stream, "read1", stream.read)
+    fields = []
+    pending = b""
+    while True:
+        chunk = read(CHUNK_SIZE)
+        if not chunk:
+            break
+        parts = (pending + chunk).split(b"\0")
+        pending = parts.pop()
+        for part in parts:
+            fields.append(part)
+            if len(fields) == LOG_FIELDS:
+                yield makeRecord(fields)
+                fields = []
+    if pending.strip():
+        fields.append(pending.rstrip(b"\n"))
+    if len(fields) == LOG_FIELDS:
+        yield makeRecord(fields)
+
+
+def readHistory(repo, *revs, max_count=None, extra_args=()):
+    """
+    Streams CommitRecords for revs (git log syntax, e.g. "main", "--all",
+    "--not", shas) from a single `git log` process. The process is stopped
+    when the generator is closed early.
+    """
+    args = ["-z", LOG_FORMAT] + list(extra_args)
+    if max_count:
+        args.append(f"--max-count={int(max_count)}")
+    proc = repo.git.log(*(args + list(revs)), as_process=True)
+    finished = False
+    try:
+        yield from parseLogStream(proc.stdout)
+        finished = True
+    finally:
+        if finished:
+            proc.wait()  # raises GitCommandError on a failed log
+        else:
+            proc.proc.terminate()
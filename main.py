@@ -1,12 +1,18 @@
 # main.py
 import sys
-from PyQt5.QtWidgets import QApplication, QMainWindow, QStackedWidget, QWidget, QVBoxLayout, QSplitter
+import time
+STARTED = time.perf_counter()  # before the Qt imports, which dominate startup
+
+import os
+from PyQt5.QtWidgets import QApplication, QMainWindow, QStackedWidget, QWidget, QVBoxLayout
+from PyQt5.QtCore import Qt, QTimer, QSettings
 from overlays import StartupOverlay
-from filepanel import FilePanel
-from graphpanel import GraphPanel
-from advanced import AdvancedPanel
-from gitintegration import GitIntegration
-from remoteinfo import RemoteInfoWidget
+from workers import GitWorker
+from perf import recorder, timed
+from perfpanel import PerfPanel, StallMonitor
+
+# GitPython and the panels are imported only once a repository is opened,
+# so the startup overlay does not wait for them
 
 class MainWindow(QMainWindow):
     def __init__(self):
@@ -14,92 +20,165 @@ class MainWindow(QMainWindow):
         self.setWindowTitle("Git DAG GUI - Small Repo Edition")
         self.resize(1200, 800)
 
-        self.git_integration = GitIntegration()
+        # Clones run on this queue; every open repository gets its own
+        self.worker = GitWorker(self)
+        self.settings = QSettings("gitdag", "Git DAG GUI")
 
         self.stack = QStackedWidget()
         self.setCentralWidget(self.stack)
 
         # Page 0: Startup overlay
         self.startupPage = QWidget()
-        from PyQt5.QtWidgets import QVBoxLayout
         startupLayout = QVBoxLayout(self.startupPage)
         self.overlay = StartupOverlay()
         startupLayout.addWidget(self.overlay)
         self.stack.addWidget(self.startupPage)
 
-        # Page 1: Main UI
-        self.mainPage = QWidget()
-        self.stack.addWidget(self.mainPage)
-        self.initMainUI()
+        # Page 1: one tab per open repository, built by ensureMainUI()
+        self.tabs = None
+
+        fileMenu = self.menuBar().addMenu("File")
+        fileMenu.addAction("New Repository...", self.createRepo)
+        fileMenu.addAction("Clone Repository...", self.cloneRepo)
+        fileMenu.addAction("Open Repository...", self.loadRepo, "Ctrl+O")
+        fileMenu.addAction("Close Repository", lambda: self.closeTab(), "Ctrl+W")
+
+        # Performance dock, hidden until toggled from the View menu (F12)
+        self.stallMonitor = StallMonitor(self)
+        self.perfPanel = PerfPanel(self)
+        self.addDockWidget(Qt.RightDockWidgetArea, self.perfPanel)
+        self.perfPanel.hide()
+        toggleAction = self.perfPanel.toggleViewAction()
+        toggleAction.setShortcut("F12")
+        self.menuBar().addMenu("View").addAction(toggleAction)
 
         # Connect overlay signals
         self.overlay.createRepositoryRequested.connect(self.createRepo)
         self.overlay.cloneRepositoryRequested.connect(self.cloneRepo)
         self.overlay.loadRepositoryRequested.connect(self.loadRepo)
-
-    def initMainUI(self):
-        from PyQt5.QtWidgets import QVBoxLayout, QHBoxLayout
-        mainLayout = QVBoxLayout(self.mainPage)
-        self.mainPage.setLayout(mainLayout)
-
-        # Graph at the top
-        self.graphPanel = GraphPanel(self.git_integration)
-        mainLayout.addWidget(self.graphPanel)
-
-        # Next row: remote info + splitter
-        rowWidget = QWidget()
-        rowLayout = QHBoxLayout(rowWidget)
-        self.remoteInfo = RemoteInfoWidget(self.git_integration)
-        rowLayout.addWidget(self.remoteInfo)
-
-        splitter = QSplitter()
-        self.filePanel = FilePanel(self.git_integration)
-        self.advancedPanel = AdvancedPanel(self.git_integration)
-        splitter.addWidget(self.filePanel)
-        splitter.addWidget(self.advancedPanel)
-        rowLayout.addWidget(splitter)
-
-        mainLayout.addWidget(rowWidget)
-
-        # Connect signals
-        self.filePanel.commitRequested.connect(self.onCommitRequested)
+        self.overlay.reopenRepositoryRequested.connect(self.reopenRepo)
+        last = self.settings.value("lastRepository", "")
+        if last and os.path.isdir(os.path.join(last, ".git")):
+            self.overlay.setLastRepository(last)
+
+    def newGitIntegration(self):
+        from gitintegration import GitIntegration
+        return GitIntegration()
+
+    @timed
+    def ensureMainUI(self):
+        if self.tabs is None:
+            from PyQt5.QtWidgets import QTabWidget
+            self.tabs = QTabWidget()
+            self.tabs.setTabsClosable(True)
+            self.tabs.setMovable(True)
+            self.tabs.setDocumentMode(True)
+            self.tabs.tabCloseRequested.connect(self.closeTab)
+            self.tabs.currentChanged.connect(self.onTabChanged)
+            self.stack.addWidget(self.tabs)
 
     def createRepo(self):
-        directory = self.git_integration.createRepository(self)
-        if directory:
-            self.afterRepoInitialization()
+        from repodialogs import createRepository
+        git_integration = self.newGitIntegration()
+        if createRepository(git_integration, self):
+            self.openTab(git_integration)
 
     def cloneRepo(self):
-        directory = self.git_integration.cloneRepository(self)
-        if directory:
-            self.afterRepoInitialization()
+        from repodialogs import cloneRepository
+        git_integration = self.newGitIntegration()
+        if cloneRepository(git_integration, self, self.worker):
+            self.openTab(git_integration)
 
     def loadRepo(self):
-        directory = self.git_integration.loadExistingRepository(self)
-        if directory:
-            self.afterRepoInitialization()
-
-    def afterRepoInitialization(self):
-        self.filePanel.refreshStatus()
-        self.remoteInfo.refresh()
-        self.graphPanel.refresh()
-        self.stack.setCurrentIndex(1)
-
-    def onCommitRequested(self, commit_message):
-        self.git_integration.commit(commit_message)
-        self.filePanel.refreshStatus()
-        self.graphPanel.refresh()
+        from repodialogs import loadExistingRepository
+        git_integration = self.newGitIntegration()
+        if loadExistingRepository(git_integration, self):
+            self.openTab(git_integration)
+
+    def reopenRepo(self, directory):
+        """Opens a known repository directly, without the directory dialog."""
+        from PyQt5.QtWidgets import QMessageBox
+        index = self.findTab(directory)
+        if index is not None:
+            self.tabs.setCurrentIndex(index)
+            self.stack.setCurrentWidget(self.tabs)
+            return
+        git_integration = self.newGitIntegration()
+        try:
+            git_integration.openRepository(directory)
+        except Exception as e:
+            QMessageBox.critical(self, "Error", f"Error loading repository: {e}")
+            return
+        self.openTab(git_integration)
+
+    def findTab(self, directory):
+        """Index of the tab showing directory, or None."""
+        if self.tabs is None:
+            return None
+        target = os.path.normcase(os.path.realpath(directory))
+        for index in range(self.tabs.count()):
+            if os.path.normcase(os.path.realpath(self.tabs.widget(index).directory())) == target:
+                return index
+        return None
+
+    @timed
+    def openTab(self, git_integration):
+        """Shows the repository of git_integration in a new tab, or switches to its tab."""
+        directory = git_integration.repo.working_tree_dir
+        self.ensureMainUI()
+        index = self.findTab(directory)
+        if index is None:
+            from repotab import RepoTab
+            tab = RepoTab(git_integration)
+            index = self.tabs.addTab(tab, os.path.basename(directory.rstrip(os.sep)) or directory)
+            self.tabs.setTabToolTip(index, directory)
+            tab.start()
+        self.tabs.setCurrentIndex(index)
+        self.settings.setValue("lastRepository", directory)
+        self.stack.setCurrentWidget(self.tabs)
+
+    def closeTab(self, index=None):
+        if self.tabs is None or not self.tabs.count():
+            return
+        if index is None:
+            index = self.tabs.currentIndex()
+        tab = self.tabs.widget(index)
+        self.tabs.removeTab(index)
+        tab.shutdown()
+        if not self.tabs.count():
+            self.stack.setCurrentWidget(self.startupPage)
+
+    def onTabChanged(self, index):
+        # Nothing is reloaded: the tab kept its graph, status and scroll state
+        if index >= 0:
+            self.settings.setValue("lastRepository", self.tabs.widget(index).directory())
+            self.setWindowTitle(f"{self.tabs.tabText(index)} - Git DAG GUI")
+        else:
+            self.setWindowTitle("Git DAG GUI - Small Repo Edition")
+
+def reportStartup(quit_after):
+    """Records the time from process start to the first event loop turn."""
+    elapsed = time.perf_counter() - STARTED
+    recorder.record("Startup", STARTED, elapsed)
+    if quit_after:
+        print(f"startup {elapsed:.4f}")
+        QApplication.quit()
 
 def main():
-    from PyQt5.QtWidgets import QApplication
+    # --startup-time prints the startup time and exits (used by benchmark.py);
+    # repository paths are opened right away, one tab each
+    args = [arg for arg in sys.argv[1:] if arg != "--startup-time"]
     app = QApplication(sys.argv)
     app.setStyleSheet("""
         QMainWindow { background-color: #202020; color: #e0e0e0; }
         QWidget { background-color: #202020; color: #e0e0e0; }
-        QListWidget { background-color: #2c2c2c; color: #e0e0e0; }
+        QListView { background-color: #2c2c2c; color: #e0e0e0; }
     """)
     window = MainWindow()
     window.show()
+    QTimer.singleShot(0, lambda: reportStartup("--startup-time" in sys.argv))
+    for path in args:
+        QTimer.singleShot(0, lambda path=path: window.reopenRepo(os.path.abspath(path)))
     sys.exit(app.exec_())
 
 if __name__ == "__main__":
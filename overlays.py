@@ -1,4 +1,5 @@
 # overlays.py
+import os
 from PyQt5.QtWidgets import QWidget, QVBoxLayout, QHBoxLayout, QPushButton, QLabel
 from PyQt5.QtCore import pyqtSignal, Qt
 from PyQt5.QtGui import QFont
@@ -7,6 +8,7 @@ class StartupOverlay(QWidget):
     createRepositoryRequested = pyqtSignal()
     cloneRepositoryRequested = pyqtSignal()
     loadRepositoryRequested = pyqtSignal()
+    reopenRepositoryRequested = pyqtSignal(str)
 
     def __init__(self, parent=None):
         super().__init__(parent)
@@ -40,6 +42,30 @@ class StartupOverlay(QWidget):
             btnLayout.addWidget(btn)
         layout.addLayout(btnLayout)
 
+        # Shown by setLastRepository() when there is a repository to reopen
+        self.lastRepository = None
+        self.reopenBtn = QPushButton()
+        self.reopenBtn.setStyleSheet("""
+            QPushButton {
+                background-color: #1f3a5a;
+                border: 1px solid #44608a;
+                padding: 10px 20px;
+                color: #e0e0e0;
+            }
+            QPushButton:hover {
+                background-color: #2a4a70;
+            }
+        """)
+        self.reopenBtn.hide()
+        layout.addWidget(self.reopenBtn)
+
         createBtn.clicked.connect(lambda: self.createRepositoryRequested.emit())
         cloneBtn.clicked.connect(lambda: self.cloneRepositoryRequested.emit())
         loadBtn.clicked.connect(lambda: self.loadRepositoryRequested.emit())
+        self.reopenBtn.clicked.connect(lambda: self.reopenRepositoryRequested.emit(self.lastRepository))
+
+    def setLastRepository(self, directory):
+        self.lastRepository = directory
+        self.reopenBtn.setText(f"Reopen {os.path.basename(directory.rstrip('/')) or directory}")
+        self.reopenBtn.setToolTip(directory)
+        self.reopenBtn.show()
@@ -0,0 +1,148 @@
+# perf.py
+"""
+Lightweight instrumentation of the hot paths.
+
+Functions decorated with @timed record one operation per call: duration,
+thread, the number of subprocesses (git commands) started while it ran and
+an optional item count. Subprocesses are counted through the
+"subprocess.Popen" audit event, so GitPython calls are covered without
+wrapping GitPython itself. Operations are kept in a bounded buffer that the
+performance panel shows and that exportTrace() writes in the Chrome trace
+event format (chrome://tracing, Perfetto).
+"""
+import os
+import sys
+import json
+import time
+import functools
+import threading
+from collections import deque
+
+MAX_EVENTS = 5000
+
+
+class Operation:
+    """One timed call. Times are perf_counter() seconds."""
+    __slots__ = ("name", "thread", "start", "duration", "subprocesses", "items", "depth")
+
+    def __init__(self, name, thread, start, depth):
+        self.name = name
+        self.thread = thread
+        self.start = start
+        self.duration = None
+        self.subprocesses = 0
+        self.items = None
+        self.depth = depth
+
+
+class PerfRecorder:
+    def __init__(self):
+        self.origin = time.perf_counter()
+        self.events = deque(maxlen=MAX_EVENTS)  # finished Operations, oldest first
+        self.local = threading.local()
+        self.version = 0  # bumped on every change, so viewers can skip redraws
+        self.enabled = True
+
+    def stack(self):
+        stack = getattr(self.local, "stack", None)
+        if stack is None:
+            stack = self.local.stack = []
+        return stack
+
+    def begin(self, name):
+        stack = self.stack()
+        op = Operation(name, threading.current_thread().name, time.perf_counter(), len(stack))
+        stack.append(op)
+        return op
+
+    def end(self, op):
+        op.duration = time.perf_counter() - op.start
+        stack = self.stack()
+        if stack and stack[-1] is op:
+            stack.pop()
+        self.events.append(op)
+        self.version += 1
+
+    def addItems(self, count):
+        """Adds count to the item count of the innermost running operation."""
+        stack = self.stack()
+        if stack:
+            op = stack[-1]
+            op.items = (op.items or 0) + count
+
+    def onAudit(self, event, args):
+        if event == "subprocess.Popen" and self.enabled:
+            # Counted for every running operation of this thread, outer ones included
+            for op in getattr(self.local, "stack", ()):
+                op.subprocesses += 1
+
+    def record(self, name, start, duration, thread="MainThread"):
+        """Records an operation measured elsewhere."""
+        op = Operation(name, thread, start, 0)
+        op.duration = duration
+        self.events.append(op)
+        self.version += 1
+
+    def recordStall(self, start, duration):
+        """Records a period in which the GUI event loop did not run."""
+        self.record("Event loop stall", start, duration)
+
+    def recent(self, count=None):
+        events = list(self.events)
+        return events[-count:] if count else events
+
+    def clear(self):
+        self.events.clear()
+        self.version += 1
+
+    def exportTrace(self, path):
+        """Writes the recorded operations as a Chrome trace event file."""
+        pid = os.getpid()
+        threads = {}
+        trace = []
+        for op in list(self.events):
+            tid = threads.setdefault(op.thread, len(threads) + 1)
+            args = {"subprocesses": op.subprocesses}
+            if op.items is not None:
+                args["items"] = op.items
+            trace.append({
+                "name": op.name, "cat": "stall" if op.name == "Event loop stall" else "op", "ph": "X",
+                "ts": (op.start - self.origin) * 1e6, "dur": op.duration * 1e6,
+                "pid": pid, "tid": tid, "args": args,
+            })
+        for name, tid in threads.items():
+            trace.append({"name": "thread_name", "ph": "M", "pid": pid, "tid": tid, "args": {"name": name}})
+        with open(path, "w") as f:
+            json.dump({"traceEvents": trace, "displayTimeUnit": "ms"}, f)
+
+
+recorder = PerfRecorder()
+sys.addaudithook(recorder.onAudit)
+
+
+def timed(fn=None, *, name=None, items=None):
+    """
+    Decorator recording each call of fn as an operation. items, if given,
+    computes the item count from the return value.
+    """
+    if fn is None:
+        return functools.partial(timed, name=name, items=items)
+    label = name or fn.__qualname__
+
+    @functools.wraps(fn)
+    def wrapper(*args, **kwargs):
+        if not recorder.enabled:
+            return fn(*args, **kwargs)
+        op = recorder.begin(label)
+        try:
+            result = fn(*args, **kwargs)
+            if items is not None and result is not None:
+                op.items = items(result)
+            return result
+        finally:
+            recorder.end(op)
+    return wrapper
+
+
+def addItems(count):
+    recorder.addItems(count)
@@ -0,0 +1,110 @@
+# perfpanel.py
+import time
+from PyQt5.QtWidgets import (
+    QDockWidget, QWidget, QVBoxLayout, QHBoxLayout, QPushButton, QLabel,
+    QTableWidget, QTableWidgetItem, QHeaderView, QFileDialog, QAbstractItemView
+)
+from PyQt5.QtCore import QObject, QTimer, Qt
+from PyQt5.QtGui import QColor
+from perf import recorder
+
+STALL_INTERVAL_MS = 50
+# Event loop delays shorter than this are not reported as stalls
+STALL_THRESHOLD = 0.1
+VISIBLE_EVENTS = 200
+
+
+class StallMonitor(QObject):
+    """Detects event loop stalls from how late a fast repeating timer fires."""
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.timer = QTimer(self)
+        self.timer.setInterval(STALL_INTERVAL_MS)
+        self.timer.timeout.connect(self.onTick)
+        self.last = time.perf_counter()
+        self.timer.start()
+
+    def onTick(self):
+        now = time.perf_counter()
+        late = now - self.last - STALL_INTERVAL_MS / 1000
+        if late > STALL_THRESHOLD:
+            recorder.recordStall(self.last + STALL_INTERVAL_MS / 1000, late)
+        self.last = now
+
+
+class PerfPanel(QDockWidget):
+    """Dock listing recent operations and event loop stalls, newest first."""
+    def __init__(self, parent=None):
+        super().__init__("Performance", parent)
+        self.setObjectName("perfPanel")
+        self.shownVersion = None
+
+        body = QWidget()
+        layout = QVBoxLayout(body)
+        layout.setContentsMargins(4, 4, 4, 4)
+
+        self.summaryLabel = QLabel()
+        layout.addWidget(self.summaryLabel)
+
+        self.table = QTableWidget(0, 5)
+        self.table.setHorizontalHeaderLabels(["Operation", "Thread", "ms", "Subprocesses", "Items"])
+        self.table.horizontalHeader().setSectionResizeMode(0, QHeaderView.Stretch)
+        self.table.verticalHeader().setVisible(False)
+        self.table.setEditTriggers(QAbstractItemView.NoEditTriggers)
+        self.table.setSelectionBehavior(QAbstractItemView.SelectRows)
+        layout.addWidget(self.table)
+
+        buttons = QHBoxLayout()
+        clearButton = QPushButton("Clear")
+        clearButton.clicked.connect(recorder.clear)
+        exportButton = QPushButton("Export Trace...")
+        exportButton.clicked.connect(self.onExportTrace)
+        buttons.addWidget(clearButton)
+        buttons.addWidget(exportButton)
+        buttons.addStretch()
+        layout.addLayout(buttons)
+        self.setWidget(body)
+
+        # Polled only while visible; recording itself never touches the GUI
+        self.timer = QTimer(self)
+        self.timer.setInterval(500)
+        self.timer.timeout.connect(self.updateTable)
+        self.visibilityChanged.connect(self.onVisibilityChanged)
+
+    def onVisibilityChanged(self, visible):
+        if visible:
+            self.updateTable()
+            self.timer.start()
+        else:
+            self.timer.stop()
+
+    def updateTable(self):
+        if recorder.version == self.shownVersion:
+            return
+        self.shownVersion = recorder.version
+        events = recorder.recent()
+        stalls = [op.duration for op in events if op.name == "Event loop stall"]
+        summary = f"{len(events)} operations recorded"
+        if stalls:
+            summary += f", {len(stalls)} stalls (longest {max(stalls) * 1000:.0f} ms)"
+        self.summaryLabel.setText(summary)
+
+        shown = events[-VISIBLE_EVENTS:][::-1]
+        self.table.setUpdatesEnabled(False)
+        self.table.setRowCount(len(shown))
+        for row, op in enumerate(shown):
+            values = ["  " * op.depth + op.name, op.thread, f"{op.duration * 1000:.1f}",
+                      str(op.subprocesses), "" if op.items is None else str(op.items)]
+            for column, value in enumerate(values):
+                item = QTableWidgetItem(value)
+                if column >= 2:
+                    item.setTextAlignment(Qt.AlignRight | Qt.AlignVCenter)
+                if op.name == "Event loop stall":
+                    item.setForeground(QColor(230, 90, 90))
+                self.table.setItem(row, column, item)
+        self.table.setUpdatesEnabled(True)
+
+    def onExportTrace(self):
+        path, _ = QFileDialog.getSaveFileName(self, "Export Trace", "gitdag-trace.json", "Trace files (*.json)")
+        if path:
+            recorder.exportTrace(path)
@@ -0,0 +1,108 @@
+# rebaseplanner.py
+from PyQt5.QtWidgets import (
+    QDialog, QVBoxLayout, QHBoxLayout, QListWidget, QListWidgetItem, QPushButton,
+    QLabel, QDialogButtonBox, QAbstractItemView
+)
+from PyQt5.QtCore import Qt
+from PyQt5.QtGui import QColor, QFont
+from gitintegration import REBASE_ACTIONS, rebasePlanError
+
+ShaRole = Qt.UserRole + 1
+ActionRole = Qt.UserRole + 2
+SummaryRole = Qt.UserRole + 3
+
+ACTION_COLORS = {
+    "pick": QColor(224, 224, 224),
+    "squash": QColor(120, 170, 220),
+    "fixup": QColor(120, 170, 220),
+    "drop": QColor(110, 110, 110),
+}
+
+
+class RebasePlannerDialog(QDialog):
+    """
+    Edits an interactive rebase todo list in the app: commits are listed
+    oldest first, can be reordered by dragging or with the move buttons,
+    and marked pick, squash (into the commit above), fixup or drop.
+    """
+    def __init__(self, base, commits, parent=None):
+        super().__init__(parent)
+        self.setWindowTitle("Interactive Rebase")
+        self.resize(640, 480)
+
+        layout = QVBoxLayout(self)
+        layout.addWidget(QLabel(f"Replaying {len(commits)} commits onto {base[:7]}, oldest first:"))
+
+        self.list = QListWidget()
+        self.list.setSelectionMode(QAbstractItemView.ExtendedSelection)
+        self.list.setDragDropMode(QAbstractItemView.InternalMove)
+        self.list.setFont(QFont("Monospace"))
+        for sha, summary, author in commits:
+            item = QListWidgetItem()
+            item.setData(ShaRole, sha)
+            item.setData(ActionRole, "pick")
+            item.setToolTip(f"{sha}\n{author}")
+            item.setData(SummaryRole, summary)
+            self.list.addItem(item)
+            self.updateItem(item)
+        layout.addWidget(self.list)
+
+        actions = QHBoxLayout()
+        for action in REBASE_ACTIONS:
+            button = QPushButton(action.capitalize())
+            button.clicked.connect(lambda _checked, action=action: self.setAction(action))
+            actions.addWidget(button)
+        upButton = QPushButton("Move Up")
+        upButton.clicked.connect(lambda: self.moveSelected(-1))
+        downButton = QPushButton("Move Down")
+        downButton.clicked.connect(lambda: self.moveSelected(1))
+        actions.addStretch()
+        actions.addWidget(upButton)
+        actions.addWidget(downButton)
+        layout.addLayout(actions)
+
+        self.errorLabel = QLabel()
+        self.errorLabel.setStyleSheet("color: #e06060;")
+        layout.addWidget(self.errorLabel)
+
+        buttons = QDialogButtonBox(QDialogButtonBox.Ok | QDialogButtonBox.Cancel)
+        buttons.button(QDialogButtonBox.Ok).setText("Rebase")
+        buttons.accepted.connect(self.onAccept)
+        buttons.rejected.connect(self.reject)
+        layout.addWidget(buttons)
+
+    def updateItem(self, item):
+        action = item.data(ActionRole)
+        sha = item.data(ShaRole)
+        item.setText(f"{action:<7} {sha[:7]}  {item.data(SummaryRole)}")
+        item.setForeground(ACTION_COLORS[action])
+        font = QFont(self.list.font())
+        font.setStrikeOut(action == "drop")
+        item.setFont(font)
+
+    def setAction(self, action):
+        for item in self.list.selectedItems():
+            item.setData(ActionRole, action)
+            self.updateItem(item)
+        self.errorLabel.clear()
+
+    def moveSelected(self, step):
+        rows = sorted(self.list.row(item) for item in self.list.selectedItems())
+        if not rows or rows[0] + step < 0 or rows[-1] + step >= self.list.count():
+            return
+        for row in (rows if step < 0 else reversed(rows)):
+            item = self.list.takeItem(row)
+            self.list.insertItem(row + step, item)
+            item.setSelected(True)
+
+    def plan(self):
+        """The todo list as (action, sha), oldest first."""
+        return [(self.list.item(row).data(ActionRole), self.list.item(row).data(ShaRole))
+                for row in range(self.list.count())]
+
+    def onAccept(self):
+        error = rebasePlanError(self.plan())
+        if error:
+            self.errorLabel.setText(error)
+            return
+        self.accept()
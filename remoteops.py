@@ -0,0 +1,85 @@
+# remoteops.py
+import re
+import subprocess
+import threading
+from git.exc import GitCommandError
+
+# "Receiving objects:  45% (450/1000), 1.2 MiB | 2.0 MiB/s"
+PROGRESS_RE = re.compile(r"^(?:remote: )?(?P<stage>[A-Za-z][A-Za-z ]*):\s+\d+% \((?P<current>\d+)/(?P<total>\d+)\)")
+
+
+class OperationCancelled(Exception):
+    """Raised when a remote operation was cancelled by the user."""
+
+
+def runRemoteCommand(args, cwd=None, progress=None, cancel=None):
+    """
+    Runs a git network command with --progress, streams its progress lines to
+    progress(current, total, message) and kills it when the cancel event is
+    set. Raises OperationCancelled or GitCommandError; returns git's stderr.
+    """
+    command = ["git"] + args
+    proc = subprocess.Popen(command, cwd=cwd, stdin=subprocess.DEVNULL,
+                            stdout=subprocess.DEVNULL, stderr=subprocess.PIPE)
+
+    cancelled = threading.Event()
+    if cancel is not None:
+        def watchCancel():
+            while proc.poll() is None:
+                if cancel.wait(0.1):
+                    cancelled.set()
+                    proc.terminate()  # lets git clean up a half-finished clone
+                    return
+        threading.Thread(target=watchCancel, daemon=True).start()
+
+    messages = []
+    pending = b""
+    while True:
+        chunk = proc.stderr.read1(4096)
+        if not chunk:
+            break
+        # Progress lines are redrawn with '\r', final lines end with '\n'
+        parts = re.split(rb"[\r\n]", pending + chunk)
+        pending = parts.pop()
+        for part in parts:
+            line = part.decode("utf-8", errors="replace").strip()
+            if not line:
+                continue
+            match = PROGRESS_RE.match(line)
+            if match:
+                if progress:
+                    progress(int(match.group("current")), int(match.group("total")), match.group("stage"))
+            else:
+                messages.append(line)
+    if pending.strip():
+        messages.append(pending.decode("utf-8", errors="replace").strip())
+    proc.wait()
+
+    if cancelled.is_set():
+        raise OperationCancelled("Operation cancelled.")
+    stderr = "\n".join(messages)
+    if proc.returncode != 0:
+        raise GitCommandError(command, proc.returncode, stderr)
+    return stderr
+
+
+def clone(url, directory, depth=None, filter_spec=None, progress=None, cancel=None):
+    """
+    Clones url into directory. depth makes a shallow clone (--depth), and
+    filter_spec a partial clone (e.g. "blob:none" fetches blobs on demand).
+    """
+    args = ["clone", "--progress"]
+    if depth:
+        args.append(f"--depth={int(depth)}")
+    if filter_spec:
+        args.append(f"--filter={filter_spec}")
+    args += ["--", url, directory]
+    return runRemoteCommand(args, progress=progress, cancel=cancel)
+
+
+def fetch(repo_dir, remote="origin", progress=None, cancel=None):
+    return runRemoteCommand(["fetch", "--progress", remote], cwd=repo_dir, progress=progress, cancel=cancel)
+
+
+def push(repo_dir, remote, refspec, progress=None, cancel=None):
+    return runRemoteCommand(["push", "--progress", remote, refspec], cwd=repo_dir, progress=progress, cancel=cancel)
@@ -0,0 +1,58 @@
+# repodialogs.py
+from PyQt5.QtWidgets import QFileDialog, QInputDialog, QMessageBox
+from workers import showProgress
+import remoteops
+
+# Clone modes offered in the clone dialog: label -> (depth, filter)
+CLONE_MODES = {
+    "Full clone": (None, None),
+    "Shallow clone (latest commit only)": (1, None),
+    "Partial clone (file contents on demand)": (None, "blob:none"),
+}
+
+
+def createRepository(git_integration, parent_widget):
+    """Asks for a directory and creates a repository in it. Returns the directory or None."""
+    directory = QFileDialog.getExistingDirectory(parent_widget, "Select Directory for New Repository")
+    if directory:
+        try:
+            return git_integration.initRepository(directory)
+        except Exception as e:
+            QMessageBox.critical(parent_widget, "Error", f"Error creating repository: {e}")
+    return None
+
+
+def cloneRepository(git_integration, parent_widget, worker):
+    """Asks for a URL, clone mode and directory, then clones with a progress dialog."""
+    url, ok = QInputDialog.getText(parent_widget, "Clone Repository", "Enter repository URL:")
+    if ok and url:
+        mode, ok = QInputDialog.getItem(parent_widget, "Clone Repository", "Clone mode:",
+                                        list(CLONE_MODES), 0, False)
+        if not ok:
+            return None
+        directory = QFileDialog.getExistingDirectory(parent_widget, "Select Directory for Cloned Repository")
+        if directory:
+            depth, filter_spec = CLONE_MODES[mode]
+            # Clone on the worker thread; the event loop keeps running meanwhile
+            job = worker.submit(git_integration.cloneInto, url, directory, depth, filter_spec,
+                                reports_progress=True, cancellable=True)
+            showProgress(job, parent_widget, "Cloning repository")
+            try:
+                worker.wait(job)
+                return directory
+            except remoteops.OperationCancelled:
+                return None
+            except Exception as e:
+                QMessageBox.critical(parent_widget, "Error", f"Error cloning repository: {e}")
+    return None
+
+
+def loadExistingRepository(git_integration, parent_widget):
+    """Asks for an existing repository and opens it. Returns the directory or None."""
+    directory = QFileDialog.getExistingDirectory(parent_widget, "Select Existing Repository")
+    if directory:
+        try:
+            return git_integration.openRepository(directory)
+        except Exception as e:
+            QMessageBox.critical(parent_widget, "Error", f"Error loading repository: {e}")
+    return None
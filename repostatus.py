@@ -0,0 +1,76 @@
+# repostatus.py
+
+# Per-file states produced by the status engine
+UNMODIFIED = "unmodified"
+MODIFIED = "modified"
+UNTRACKED = "untracked"
+STAGED = "staged"
+STAGED_MODIFIED = "staged-modified"
+
+
+class RepoStatus:
+    """
+    File states of a working tree, ready for the file panel.
+
+    working:   sorted (path, state) for every tracked and untracked file;
+               state is UNMODIFIED, MODIFIED or UNTRACKED.
+    staged:    sorted (path, state) for files whose index entry differs from
+               HEAD; state is STAGED, or STAGED_MODIFIED when the working tree
+               changed the file again after staging.
+    committed: sorted paths touched by the HEAD commit.
+    """
+    __slots__ = ("working", "staged", "committed")
+
+    def __init__(self, working, staged, committed):
+        self.working = working
+        self.staged = staged
+        self.committed = committed
+
+
+def parseStatus(porcelain, tracked, committed, ignored_folders=()):
+    """
+    Builds a RepoStatus in one pass over NUL separated outputs of
+    `git status --porcelain=v2 -z`, `git ls-files -z` and
+    `git diff-tree --name-only -z -r HEAD`.
+    """
+    working = dict.fromkeys((p for p in tracked.split("\0") if p), UNMODIFIED)
+    staged = {}
+
+    records = porcelain.split("\0")
+    i = 0
+    while i < len(records):
+        record = records[i]
+        i += 1
+        if not record:
+            continue
+        kind = record[0]
+        if kind == "?":
+            working[record[2:]] = UNTRACKED
+            continue
+        if kind == "1":
+            fields = record.split(" ", 8)
+        elif kind == "2":
+            fields = record.split(" ", 9)
+            i += 1  # the original path of a rename/copy follows as its own record
+        elif kind == "u":
+            fields = record.split(" ", 10)
+            working[fields[-1]] = MODIFIED
+            continue
+        else:
+            continue  # ignored ('!') and unknown records
+        path = fields[-1]
+        index_state, worktree_state = fields[1][0], fields[1][1]
+        if worktree_state != ".":
+            working[path] = MODIFIED
+        if index_state != ".":
+            staged[path] = STAGED_MODIFIED if worktree_state != "." else STAGED
+
+    if ignored_folders:
+        working = {path: state for path, state in working.items()
+                   if not ignored_folders.intersection(path.split("/"))}
+
+    return RepoStatus(
+        sorted(working.items()),
+        sorted(staged.items()),
+        sorted(p for p in committed.split("\0") if p),
+    )
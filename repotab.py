@@ -0,0 +1,136 @@
+# repotab.py
+from PyQt5.QtWidgets import QWidget, QVBoxLayout, QHBoxLayout, QSplitter, QTabWidget
+from filepanel import FilePanel
+from graphpanel import GraphPanel
+from advanced import AdvancedPanel
+from remoteinfo import RemoteInfoWidget
+from repowatcher import RepoWatcher
+from diffview import DiffView
+from blameview import BlameView
+from diffreader import WORKING
+from workers import GitWorker
+
+
+class RepoTab(QWidget):
+    """
+    Everything shown for one open repository: its GitIntegration, panels,
+    watcher and job queue. A tab keeps its loaded graph, status, diff and
+    scroll positions while other tabs are shown, so switching back is instant.
+    """
+    def __init__(self, git_integration, parent=None):
+        super().__init__(parent)
+        self.git_integration = git_integration
+        # This repository's own job queue, running on the shared pool
+        self.worker = GitWorker(self)
+
+        mainLayout = QVBoxLayout(self)
+
+        # Graph at the top
+        self.graphPanel = GraphPanel(self.git_integration, self.worker)
+        mainLayout.addWidget(self.graphPanel)
+
+        # Next row: remote info + splitter
+        rowWidget = QWidget()
+        rowLayout = QHBoxLayout(rowWidget)
+        self.remoteInfo = RemoteInfoWidget(self.git_integration)
+        rowLayout.addWidget(self.remoteInfo)
+
+        splitter = QSplitter()
+        self.filePanel = FilePanel(self.git_integration, self.worker)
+        # Diff and blame of the selected file share one pane
+        self.inspector = QTabWidget()
+        self.diffView = DiffView(self.git_integration)
+        self.blameView = BlameView(self.git_integration)
+        self.inspector.addTab(self.diffView, "Diff")
+        self.inspector.addTab(self.blameView, "Blame")
+        self.selection = None  # (path, diff mode) last selected in the file lists
+        self.advancedPanel = AdvancedPanel(self.git_integration, self.worker)
+        splitter.addWidget(self.filePanel)
+        splitter.addWidget(self.inspector)
+        splitter.addWidget(self.advancedPanel)
+        rowLayout.addWidget(splitter)
+
+        mainLayout.addWidget(rowWidget)
+
+        # Connect signals
+        self.filePanel.commitRequested.connect(self.onCommitRequested)
+        self.filePanel.fileSelected.connect(self.onFileSelected)
+        self.filePanel.blameRequested.connect(self.onBlameRequested)
+        self.inspector.currentChanged.connect(self.onInspectorChanged)
+        self.blameView.commitActivated.connect(self.graphPanel.showCommit)
+        self.advancedPanel.statusChanged.connect(self.onStatusChanged)
+        self.advancedPanel.historyChanged.connect(self.onHistoryChanged)
+
+        # External changes (editors, CLI) refresh only the panels they affect
+        self.watcher = RepoWatcher(parent=self)
+        self.watcher.statusChanged.connect(self.filePanel.refreshStatus)
+        self.watcher.statusChanged.connect(self.diffView.reload)
+        self.watcher.graphChanged.connect(self.graphPanel.refresh)
+
+    def directory(self):
+        return self.git_integration.repo.working_tree_dir
+
+    def start(self):
+        """Loads the repository into the panels and starts watching it."""
+        self.watcher.setRepository(self.git_integration.repo)
+        self.filePanel.refreshStatus()
+        self.remoteInfo.refresh()
+        self.graphPanel.refresh()
+        self.advancedPanel.refreshStashes()
+
+    def shutdown(self):
+        """
+        Stops watching and deletes the tab once its queue has drained, so
+        results of jobs still running never reach deleted panels.
+        """
+        self.watcher.setRepository(None)
+        self.diffView.stop()
+        self.blameView.stop()
+        for job in list(self.worker.jobs):
+            job.cancel()
+        job = self.worker.submit(self.releaseRepository)
+        job.signals.finished.connect(self.deleteLater)
+        job.signals.failed.connect(self.deleteLater)
+
+    def releaseRepository(self):
+        if self.git_integration.commit_cache is not None:
+            self.git_integration.commit_cache.close()
+            self.git_integration.commit_cache = None
+
+    def onFileSelected(self, path, mode):
+        self.selection = (path, mode)
+        self.diffView.showDiff(path, mode)
+        if self.inspector.currentWidget() is self.blameView:
+            self.blameView.showBlame(path, mode == WORKING)
+
+    def onBlameRequested(self, path, working):
+        # Switching tabs would otherwise blame the selection instead
+        self.inspector.blockSignals(True)
+        self.inspector.setCurrentWidget(self.blameView)
+        self.inspector.blockSignals(False)
+        self.blameView.showBlame(path, working)
+
+    def onInspectorChanged(self, _index):
+        # Blame runs only when it is looked at
+        if self.inspector.currentWidget() is self.blameView and self.selection is not None:
+            path, mode = self.selection
+            self.blameView.showBlame(path, mode == WORKING)
+
+    def onStatusChanged(self):
+        self.filePanel.refreshStatus()
+        self.diffView.reload()
+
+    def onHistoryChanged(self):
+        self.onStatusChanged()
+        self.graphPanel.refresh()
+        self.blameView.reload()
+
+    def onCommitRequested(self, commit_message):
+        job = self.worker.submit(self.git_integration.commit, commit_message)
+        job.signals.finished.connect(self.afterCommit)
+
+    def afterCommit(self, _result):
+        self.filePanel.refreshStatus()
+        self.graphPanel.refresh()
+        self.diffView.reload()
+        self.blameView.reload()
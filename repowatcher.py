@@ -0,0 +1,169 @@
+# repowatcher.py
+import os
+from PyQt5.QtCore import QObject, QFileSystemWatcher, QTimer, pyqtSignal
+from gitintegration import IGNORED_FOLDERS
+from workers import GitWorker
+
+# Individual files are only watched up to this many; beyond it the watcher
+# relies on directory events (files created, removed or replaced) to stay
+# within the OS watch limits.
+MAX_FILE_WATCHES = 2000
+
+
+def collectWatches(top, files, budget):
+    """
+    Walks top for the directories to watch and, with files, up to budget
+    files in them. Returns (directories, files); runs on a worker thread.
+    """
+    dirs = []
+    file_paths = []
+    for root, subdirs, names in os.walk(top):
+        subdirs[:] = [d for d in subdirs if d not in IGNORED_FOLDERS]
+        dirs.append(root)
+        if files and len(file_paths) < budget:
+            file_paths.extend(os.path.join(root, n) for n in names[:budget - len(file_paths)])
+    return dirs, file_paths
+
+
+class RepoWatcher(QObject):
+    """
+    Watches a repository and tells the panels what to refresh.
+
+    The working tree (minus IGNORED_FOLDERS), the .git directory and
+    .git/refs are watched with QFileSystemWatcher. Events are collected for
+    a short debounce window and then classified:
+    - working tree changes and a rewritten .git/index -> statusChanged
+    - HEAD, packed-refs or anything under .git/refs -> graphChanged and statusChanged
+    Other writes inside .git (lock files, FETCH_HEAD, caches) are ignored.
+    Directory trees are walked on a worker of the watcher's own, so opening
+    a large repository does not freeze the window.
+    """
+    statusChanged = pyqtSignal()
+    graphChanged = pyqtSignal()
+
+    def __init__(self, debounce_ms=250, parent=None):
+        super().__init__(parent)
+        self.watcher = QFileSystemWatcher(self)
+        self.watcher.directoryChanged.connect(self.onPathChanged)
+        self.watcher.fileChanged.connect(self.onPathChanged)
+
+        # Fixed window from the first event, so a long burst cannot starve refreshes
+        self.timer = QTimer(self)
+        self.timer.setSingleShot(True)
+        self.timer.setInterval(debounce_ms)
+        self.timer.timeout.connect(self.flush)
+
+        self.worker = GitWorker(self)
+        self.scans = set()  # walks running for the current repository
+
+        self.root = None
+        self.git_dir = None
+        self.refs_dir = None
+        self.pending = set()
+        self.git_stamps = {}
+
+    def setRepository(self, repo):
+        """Starts watching repo (or stops watching when repo is None)."""
+        paths = self.watcher.directories() + self.watcher.files()
+        if paths:
+            self.watcher.removePaths(paths)
+        self.pending.clear()
+        self.timer.stop()
+        self.scans.clear()  # results of walks still running are dropped
+        self.root = self.git_dir = self.refs_dir = None
+        if repo is None or not repo.working_tree_dir:
+            return
+
+        self.root = os.path.normpath(repo.working_tree_dir)
+        self.git_dir = os.path.normpath(repo.git_dir)
+        self.refs_dir = os.path.join(self.git_dir, "refs")
+        self.git_stamps = self.readGitStamps()
+
+        # git replaces index, HEAD and refs by renaming lock files, which shows
+        # up as a change of their directory rather than of the file itself
+        self.watcher.addPath(self.git_dir)
+        self.watchTree(self.refs_dir, files=False)
+        self.watchTree(self.root, files=True)
+
+    def watchTree(self, top, files):
+        """Watches the directories (and files) below top once the worker has walked them."""
+        budget = MAX_FILE_WATCHES - len(self.watcher.files()) if files else 0
+        job = self.worker.submit(collectWatches, top, files, budget)
+        self.scans.add(job)
+        job.signals.finished.connect(lambda result, job=job: self.addWatches(job, result))
+        job.signals.failed.connect(lambda _error, job=job: self.scans.discard(job))
+
+    def addWatches(self, job, result):
+        if job not in self.scans:
+            return
+        self.scans.discard(job)
+        dirs, file_paths = result
+        if dirs:
+            self.watcher.addPaths(dirs)
+        if file_paths:
+            self.watcher.addPaths(file_paths[:max(0, MAX_FILE_WATCHES - len(self.watcher.files()))])
+
+    def readGitStamps(self):
+        stamps = {}
+        for name in ("index", "HEAD", "packed-refs"):
+            try:
+                stamps[name] = os.stat(os.path.join(self.git_dir, name)).st_mtime_ns
+            except OSError:
+                stamps[name] = None
+        return stamps
+
+    def onPathChanged(self, path):
+        self.pending.add(os.path.normpath(path))
+        if not self.timer.isActive():
+            self.timer.start()
+
+    def flush(self):
+        if self.root is None:
+            self.pending.clear()
+            return
+        paths, self.pending = self.pending, set()
+        status = graph = False
+
+        for path in paths:
+            if path == self.git_dir:
+                stamps = self.readGitStamps()
+                changed = {name for name in stamps if stamps[name] != self.git_stamps.get(name)}
+                self.git_stamps = stamps
+                if "HEAD" in changed or "packed-refs" in changed:
+                    graph = status = True
+                elif "index" in changed:
+                    status = True
+            elif path == self.refs_dir or path.startswith(self.refs_dir + os.sep):
+                graph = status = True
+                if os.path.isdir(path):
+                    self.watchNewDirectories(path, files=False)
+            elif path == self.root or path.startswith(self.root + os.sep):
+                if self.isIgnored(path):
+                    continue
+                status = True
+                if os.path.isdir(path):
+                    self.watchNewDirectories(path, files=True)
+                elif os.path.exists(path) and path not in self.watcher.files():
+                    # Editors that save by renaming drop the file watch; restore it
+                    self.watcher.addPath(path)
+
+        if graph:
+            self.graphChanged.emit()
+        if status:
+            self.statusChanged.emit()
+
+    def isIgnored(self, path):
+        rel = os.path.relpath(path, self.root)
+        return any(part in IGNORED_FOLDERS for part in rel.split(os.sep))
+
+    def watchNewDirectories(self, path, files):
+        """Picks up subdirectories created inside a watched directory."""
+        watched = set(self.watcher.directories())
+        try:
+            entries = list(os.scandir(path))
+        except OSError:
+            return
+        for entry in entries:
+            if entry.is_dir(follow_symlinks=False) and entry.name not in IGNORED_FOLDERS \
+                    and os.path.normpath(entry.path) not in watched:
+                self.watchTree(entry.path, files)
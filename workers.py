@@ -0,0 +1,214 @@
+# workers.py
+import os
+import threading
+from collections import deque
+from PyQt5.QtWidgets import QProgressDialog
+from PyQt5.QtCore import QObject, QRunnable, QThreadPool, QEventLoop, pyqtSignal, Qt
+
+
+class JobSignals(QObject):
+    """Signals of a GitJob. Emitted from the worker thread, delivered queued to the GUI thread."""
+    progress = pyqtSignal(int, int, str)  # current, total, message
+    partial = pyqtSignal(object)          # a piece of the result, for jobs that stream
+    finished = pyqtSignal(object)         # return value of the job function
+    failed = pyqtSignal(str)              # error message
+
+
+class GitJob(QRunnable):
+    """A single git operation executed on the worker pool."""
+    def __init__(self, fn, args, kwargs, reports_progress=False, cancellable=False, publishes=False):
+        super().__init__()
+        # The Python side keeps the job alive until its signals are delivered
+        self.setAutoDelete(False)
+        self.fn = fn
+        self.args = args
+        self.kwargs = kwargs
+        if reports_progress:
+            self.kwargs["progress"] = self.reportProgress
+        if publishes:
+            self.kwargs["publish"] = self.publish
+        # Cancellable jobs get a threading.Event they are expected to poll
+        self.cancel_event = threading.Event() if cancellable else None
+        if cancellable:
+            self.kwargs["cancel"] = self.cancel_event
+        self.signals = JobSignals()
+        self.on_done = None  # set by the GitWorker to start its next job
+        self.done = False
+        self.result = None
+        self.error = None
+
+    @property
+    def cancellable(self):
+        return self.cancel_event is not None
+
+    def cancel(self):
+        if self.cancel_event is not None:
+            self.cancel_event.set()
+
+    def publish(self, value):
+        self.signals.partial.emit(value)
+
+    def reportProgress(self, current, total, message=""):
+        self.signals.progress.emit(int(current), int(total), message)
+
+    def run(self):
+        try:
+            result = self.fn(*self.args, **self.kwargs)
+        except Exception as e:
+            self.error = e
+            self.done = True
+            self.signals.failed.emit(str(e))
+        else:
+            self.result = result
+            self.done = True
+            self.signals.finished.emit(result)
+        finally:
+            if self.on_done is not None:
+                self.on_done()
+
+
+_shared_pool = None
+
+def sharedPool():
+    """The bounded thread pool all GitWorkers run on, created on first use."""
+    global _shared_pool
+    if _shared_pool is None:
+        _shared_pool = QThreadPool()
+        _shared_pool.setMaxThreadCount(max(2, min(4, os.cpu_count() or 2)))
+    return _shared_pool
+
+
+class GitWorker(QObject):
+    """
+    Job queue running git operations off the GUI thread.
+
+    Jobs of one worker run one at a time in submission order, so operations
+    that write the index or refs never race each other. Workers (one per
+    open repository, plus readers like the diff pane) share one bounded
+    thread pool, so a dozen repositories never start more threads than the
+    pool allows. Results come back through the job's signals; wait() lets a
+    caller block on a job while the event loop keeps running.
+    """
+    def __init__(self, parent=None, pool=None):
+        super().__init__(parent)
+        self.pool = pool or sharedPool()
+        self.jobs = set()
+        self.queue = deque()  # jobs waiting for the previous one of this worker
+        self.busy = False
+        self.lock = threading.Lock()
+
+    def submit(self, fn, *args, reports_progress=False, cancellable=False, publishes=False, **kwargs):
+        """
+        Queues fn(*args, **kwargs). With reports_progress, fn gets a
+        progress(current, total, message) callback; with cancellable, a
+        cancel event that job.cancel() sets; with publishes, a publish(value)
+        callback whose values arrive through the job's partial signal.
+        """
+        job = GitJob(fn, args, kwargs, reports_progress, cancellable, publishes)
+        self.jobs.add(job)
+        job.signals.finished.connect(lambda _result, job=job: self.jobs.discard(job))
+        job.signals.failed.connect(lambda _error, job=job: self.jobs.discard(job))
+        job.on_done = self.startNext
+        with self.lock:
+            if self.busy:
+                self.queue.append(job)
+            else:
+                self.busy = True
+                self.pool.start(job)
+        return job
+
+    def startNext(self):
+        """Called on the pool thread when a job ends; hands the next queued job to the pool."""
+        with self.lock:
+            if self.queue:
+                self.pool.start(self.queue.popleft())
+            else:
+                self.busy = False
+
+    def wait(self, job):
+        """Waits for a job without blocking the event loop. Returns its result or raises its error."""
+        if not job.done:
+            loop = QEventLoop()
+            job.signals.finished.connect(loop.quit)
+            job.signals.failed.connect(loop.quit)
+            # The job may have finished between the check and the connects
+            if not job.done:
+                loop.exec_()
+        if job.error is not None:
+            raise job.error
+        return job.result
+
+    def run(self, fn, *args, **kwargs):
+        """submit() followed by wait()."""
+        return self.wait(self.submit(fn, *args, **kwargs))
+
+
+class CoalescedRefresh:
+    """
+    Runs fn on the worker and hands the result to callback. Requests made while
+    a run is in flight collapse into a single follow-up run, so a burst of
+    refresh requests never queues up a backlog of identical jobs. With a
+    partial_callback, fn gets a publish(value) callback whose values are
+    handed to it first.
+    """
+    def __init__(self, worker, fn, callback, error_callback=None, partial_callback=None):
+        self.worker = worker
+        self.fn = fn
+        self.callback = callback
+        self.error_callback = error_callback
+        self.partial_callback = partial_callback
+        self.job = None
+        self.again = False
+
+    def request(self):
+        if self.job is not None:
+            self.again = True
+            return
+        self.again = False
+        self.job = self.worker.submit(self.fn, publishes=self.partial_callback is not None)
+        if self.partial_callback is not None:
+            self.job.signals.partial.connect(self.partial_callback)
+        self.job.signals.finished.connect(self.onFinished)
+        self.job.signals.failed.connect(self.onFailed)
+
+    def onFinished(self, result):
+        self.job = None
+        if self.again:
+            # The result is already stale; fetch a fresh one instead
+            self.request()
+            return
+        self.callback(result)
+
+    def onFailed(self, error):
+        self.job = None
+        if self.error_callback:
+            self.error_callback(error)
+        if self.again:
+            self.request()
+
+
+def showProgress(job, parent, title):
+    """
+    Shows a progress dialog that follows a job's progress signal and closes
+    when it ends. Cancellable jobs get a Cancel button.
+    """
+    dialog = QProgressDialog(title, "Cancel" if job.cancellable else None, 0, 0, parent)
+    dialog.setWindowTitle(title)
+    dialog.setWindowModality(Qt.WindowModal)
+    dialog.setMinimumDuration(300)
+    # Each stage (counting, receiving, resolving...) runs to 100% on its own
+    dialog.setAutoReset(False)
+    dialog.setAutoClose(False)
+    if job.cancellable:
+        dialog.canceled.connect(job.cancel)
+
+    def onProgress(current, total, message):
+        dialog.setMaximum(total)
+        dialog.setValue(min(current, total) if total else 0)
+        if message:
+            dialog.setLabelText(f"{title}\n{message}")
+
+    job.signals.progress.connect(onProgress)
+    job.signals.finished.connect(lambda _result: dialog.close())
+    job.signals.failed.connect(lambda _error: dialog.close())
+    return dialog